@@ -0,0 +1,94 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Simulates many battles with the battle core to measure its speed and balance.
+
+Fighters get random equipment plus the class and race bonuses generate_stats
+would give them. Prints fights per second and the win rate of each race
+against each other race.
+
+Run from the repository root: python -m benchmarks.battles [fights] [seed]
+"""
+import argparse
+import time
+
+from decimal import Decimal
+from random import Random
+
+from config import classes
+from utils.battles import duel, simulate_raid_fight
+from utils.classes import make_class_tables, stat_bonuses
+
+RACES = ["Human", "Dwarf", "Elf", "Orc", "Jikill"]
+LINES, GRADES = make_class_tables(classes)
+ALL_CLASSES = list(GRADES) + ["No Class"]
+
+
+def make_fighter(rng):
+    race = rng.choice(RACES)
+    damage, armor = stat_bonuses(
+        [rng.choice(ALL_CLASSES), rng.choice(ALL_CLASSES)], race, LINES, GRADES
+    )
+    return race, damage + rng.randint(0, 100), armor + rng.randint(0, 100)
+
+
+def simulate(fights, rng, fighters):
+    duel_wins = {(a, b): [0, 0] for a in RACES for b in RACES}
+    raid_wins = {(a, b): [0, 0] for a in RACES for b in RACES}
+
+    start = time.perf_counter()
+    for i in range(fights):
+        (race1, dmg1, arm1), (race2, dmg2, arm2) = rng.sample(fighters, 2)
+        duel_wins[race1, race2][duel(dmg1 + arm1, dmg2 + arm2, rng)] += 1
+    duel_time = time.perf_counter() - start
+
+    multiplier = Decimal("1.5")
+    raid_fights = fights // 10
+    start = time.perf_counter()
+    for i in range(raid_fights):
+        (race1, dmg1, arm1), (race2, dmg2, arm2) = rng.sample(fighters, 2)
+        player1 = {"hp": 250, "damage": dmg1 * multiplier, "armor": arm1 * multiplier}
+        player2 = {"hp": 250, "damage": dmg2 * multiplier, "armor": arm2 * multiplier}
+        raid_wins[race1, race2][simulate_raid_fight(player1, player2, rng)] += 1
+    raid_time = time.perf_counter() - start
+
+    print(f"battle:     {fights / duel_time:12.0f} fights/s")
+    print(f"raidbattle: {raid_fights / raid_time:12.0f} fights/s")
+    for name, wins in (("battle", duel_wins), ("raidbattle", raid_wins)):
+        print(f"\n{name} win rate of the row race against the column race")
+        print(" " * 8 + "".join(f"{race:>8}" for race in RACES))
+        for race in RACES:
+            row = []
+            for other in RACES:
+                won = wins[race, other][0] + wins[other, race][1]
+                total = sum(wins[race, other]) + sum(wins[other, race])
+                row.append(f"{won / total:8.1%}" if total else f"{'-':>8}")
+            print(f"{race:>8}" + "".join(row))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulates battles offline.")
+    parser.add_argument("fights", type=int, nargs="?", default=1_000_000)
+    parser.add_argument("seed", type=int, nargs="?", default=0)
+    args = parser.parse_args()
+    rng = Random(args.seed)
+    fighters = [make_fighter(rng) for i in range(10_000)]
+    simulate(args.fights, rng, fighters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Compares the old linear scans of config.classes with the precomputed tables.
+
+Run from the repository root: python -m benchmarks.class_tables
+"""
+import timeit
+
+from config import classes
+from utils.classes import make_class_tables
+
+LINES, GRADES = make_class_tables(classes)
+
+
+def linear_line(class_):
+    for line, evos in classes.items():
+        if class_ in evos:
+            return line
+    return "None"
+
+
+def linear_grade(class_):
+    for line, evos in classes.items():
+        try:
+            return evos.index(class_) + 1
+        except ValueError:
+            pass
+    return 0
+
+
+def table_line(class_):
+    return LINES.get(class_, "None")
+
+
+def table_grade(class_):
+    return GRADES.get(class_, 0)
+
+
+def stat_pipeline(get_line, get_grade, profiles):
+    """Mimics the class part of Bot.generate_stats for many profiles"""
+    for profile in profiles:
+        for class_ in profile:
+            get_line(class_)
+            get_grade(class_)
+
+
+def main():
+    all_classes = [c for evos in classes.values() for c in evos] + ["No Class"]
+    # pairs of classes like the profile's class column, late grades are the worst case
+    profiles = [(a, b) for a in all_classes for b in all_classes]
+    number = 20
+    calls = len(profiles) * 2 * number
+
+    for name, line, grade in (
+        ("linear", linear_line, linear_grade),
+        ("table", table_line, table_grade),
+    ):
+        taken = timeit.timeit(
+            lambda: stat_pipeline(line, grade, profiles), number=number
+        )
+        print(f"{name:>6}: {taken / calls * 1e9:8.1f} ns per class lookup")
+
+
+if __name__ == "__main__":
+    main()
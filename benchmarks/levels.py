@@ -0,0 +1,56 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Compares the old linear scan of the level table with the bisect based
+lookups in utils.levels.
+
+Run from the repository root: python -m benchmarks.levels
+"""
+import timeit
+
+from random import Random
+
+from utils.levels import LEVEL_XP, MAX_LEVEL, xptolevel, xptolevels
+
+
+def linear_xptolevel(xp):
+    for level, point in enumerate(LEVEL_XP, start=1):
+        if xp == point:
+            return level
+        elif xp < point:
+            return level - 1
+    return MAX_LEVEL
+
+
+def main():
+    rng = Random(0)
+    # high levels are the worst case for the linear scan
+    xps = [rng.randint(0, 6_000_000) for i in range(10_000)]
+    number = 20
+    calls = len(xps) * number
+
+    for name, stmt in (
+        ("linear", lambda: [linear_xptolevel(xp) for xp in xps]),
+        ("bisect", lambda: [xptolevel(xp) for xp in xps]),
+        ("batch", lambda: xptolevels(xps)),
+    ):
+        taken = timeit.timeit(stmt, number=number)
+        print(f"{name:>6}: {taken / calls * 1e9:8.1f} ns per lookup")
+
+
+if __name__ == "__main__":
+    main()
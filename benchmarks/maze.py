@@ -0,0 +1,51 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Measures maze generation, full rendering and rendering the player's
+surroundings for different maze sizes.
+
+Run from the repository root: python -m benchmarks.maze
+"""
+import timeit
+
+from utils.maze import Maze
+
+
+def main():
+    for size in (15, 50, 100, 200):
+        number = max(1, 6000 // (size * size) * 10)
+        maze = Maze.generate(size, size)
+
+        generate = timeit.timeit(lambda: Maze.generate(size, size), number=number)
+
+        def full_render():
+            maze._rows = None
+            maze.render()
+
+        render = timeit.timeit(full_render, number=number)
+        window = timeit.timeit(
+            lambda: maze.render(size // 2, size // 2, radius=2), number=number * 100
+        )
+        print(
+            f"{size:>3}x{size:<3} generate: {generate / number * 1e3:8.2f} ms,"
+            f" render: {render / number * 1e3:8.2f} ms,"
+            f" surroundings: {window / number / 100 * 1e6:8.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Measures how fast the boss raid engine simulates turns without Discord.
+
+Run from the repository root: python -m benchmarks.raid
+"""
+import time
+
+from decimal import Decimal
+
+from utils.raid import BossRaid
+
+
+def make_raid(raiders, seed):
+    raid = {
+        i: {"hp": 100, "armor": Decimal(i % 60), "damage": Decimal(i % 80)}
+        for i in range(raiders)
+    }
+    boss = {"hp": raiders * 400, "min_dmg": 100, "max_dmg": 500}
+    return BossRaid(raid, boss, seed=seed)
+
+
+def main():
+    for raiders in (10, 100, 1000):
+        turns = 0
+        taken = 0.0
+        for seed in range(20):
+            raid = make_raid(raiders, seed)
+            start = time.perf_counter()
+            turns += len(raid.run())
+            taken += time.perf_counter() - start
+        print(
+            f"{raiders:>5} raiders: {turns / taken:10.0f} turns/s,"
+            f" {turns / 20:6.1f} turns per raid"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+Compares the old secrets based gameplay randomness with the backends of
+utils.random.
+
+Run from the repository root: python -m benchmarks.rng
+"""
+import secrets
+import timeit
+
+from copy import copy
+from random import Random, SystemRandom
+
+from utils import random
+
+
+def old_randint(a, b):
+    return secrets.randbelow(b - a + 1) + a
+
+
+def old_shuffle(population):
+    n = len(population)
+    population = copy(population)
+    return [population.pop(secrets.randbelow(n - i)) for i in range(n)]
+
+
+def run(name, randint, choice, shuffle):
+    seq = list(range(100))
+    for label, stmt, number in (
+        ("randint", lambda: randint(1, 100), 100_000),
+        ("choice", lambda: choice(seq), 100_000),
+        ("shuffle 1k", lambda: shuffle(list(range(1_000))), 200),
+        ("shuffle 100k", lambda: shuffle(list(range(100_000))), 2),
+    ):
+        taken = timeit.timeit(stmt, number=number)
+        print(f"{name:>13} {label:>12}: {taken / number * 1e6:10.2f} us per call")
+
+
+def main():
+    run("old secrets", old_randint, secrets.choice, old_shuffle)
+    for name, backend in (
+        ("SystemRandom", SystemRandom()),
+        ("Random", Random(0)),
+    ):
+        random.set_backend(backend)
+        run(name, random.randint, random.choice, random.shuffle)
+
+
+if __name__ == "__main__":
+    main()
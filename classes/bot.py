@@ -24,6 +24,7 @@ import sys
 import traceback
 
 from decimal import Decimal
+from time import perf_counter
 from typing import Union
 
 import aiohttp
@@ -37,16 +38,32 @@ from discord.ext import commands
 
 import config
 
+from classes import queries
 from classes.cache import RedisCache
 from classes.context import Context
+from classes.cooldowns import CooldownStore
 from classes.enums import DonatorRank
 from classes.exceptions import GlobalCooldown
 from classes.http import ProxiedClientSession
+from classes.profiling import (
+    CommandProfile,
+    ProfiledConnection,
+    ProfiledRedisConnection,
+    Profiler,
+    count_http,
+    current_profile,
+    slow_queries,
+)
+from classes.transaction_log import TransactionLogWriter
 from utils import i18n, paginator, random
 from utils.cache import cache
 from utils.checks import user_is_patron
+from utils.classes import make_class_tables, stat_bonuses
 from utils.i18n import _
 
+# Finished adventures are kept for 3 days before they expire
+ADVENTURE_RETENTION = 259_200
+
 
 class Bot(commands.AutoShardedBot):
     def __init__(self, **kwargs):
@@ -66,6 +83,14 @@ class Bot(commands.AutoShardedBot):
         self.linecount = 0
         self.make_linecount()
         self.all_prefixes = {}
+        self.profiler = Profiler()
+        self.slow_queries = slow_queries
+        slow_queries.threshold = config.slow_query_threshold
+        slow_queries.explain_count = config.slow_query_explain_count
+        self.http.request = count_http(self.http.request)
+        self.prefix_tuples = {}
+        self.default_prefixes = (config.global_prefix,)
+        self.load_class_tables()
         self.activity = discord.Game(
             name=f"IdleRPG v{config.version}" if config.is_beta else config.base_url
         )
@@ -122,12 +147,26 @@ class Bot(commands.AutoShardedBot):
         )
         self.trusted_session = aiohttp.ClientSession()
         self.redis = await aioredis.create_pool(
-            "redis://localhost", minsize=10, maxsize=20
+            "redis://localhost",
+            minsize=10,
+            maxsize=20,
+            connection_cls=ProfiledRedisConnection,
         )
         self.pool = await asyncpg.create_pool(
-            **self.config.database, min_size=10, max_size=20, command_timeout=60.0
+            **self.config.database,
+            min_size=10,
+            max_size=20,
+            command_timeout=60.0,
+            connection_class=ProfiledConnection,
+            init=queries.prepare_statements,
         )
+        self.slow_queries.pool = self.pool
         self.cache = RedisCache(self)
+        self.loop.create_task(self.cache.ensure_leaderboards())
+        self.cooldowns = CooldownStore(self)
+        self.transaction_log = TransactionLogWriter(
+            self, sync=self.config.transaction_log_sync
+        )
 
         for extension in self.config.initial_extensions:
             try:
@@ -165,10 +204,30 @@ class Bot(commands.AutoShardedBot):
             await self.on_message(after)
 
     async def invoke(self, ctx):
-        """Handler for i18n, executes before any other commands or checks run"""
+        """
+        Handler for i18n, executes before any other commands or checks run
+        Also records the time and calls made by every command
+        """
         locale = await self.get_cog("Locale").locale(ctx.message.author.id)
         i18n.current_locale.set(locale)
-        await super().invoke(ctx)
+        if ctx.command is None:
+            return await super().invoke(ctx)
+        ctx.profile = CommandProfile()
+        token = current_profile.set(ctx.profile)
+        start = perf_counter()
+        try:
+            await super().invoke(ctx)
+        finally:
+            self.profiler.record(
+                ctx.command.qualified_name, (perf_counter() - start) * 1000, ctx.profile
+            )
+            current_profile.reset(token)
+
+    async def close(self):
+        """Writes the buffered transaction log before shutting down"""
+        if hasattr(self, "transaction_log"):
+            await self.transaction_log.close()
+        await super().close()
 
     @property
     def uptime(self):
@@ -178,6 +237,11 @@ class Bot(commands.AutoShardedBot):
     async def get_ranks_for(self, thing, conn=None):
         """Returns the rank in money and xp for a user"""
         v = thing.id if isinstance(thing, (discord.Member, discord.User)) else thing
+        money = await self.cache.get_rank(v, "money")
+        xp = await self.cache.get_rank(v, "xp")
+        if money is not None and xp is not None:
+            return money, xp
+        # not on the leaderboards yet, fall back to Postgres
         if conn is None:
             conn = await self.pool.acquire()
             local = True
@@ -236,22 +300,83 @@ class Bot(commands.AutoShardedBot):
         damage, armor = await self.get_damage_armor_for(
             v, classes=classes, race=race, conn=conn
         )
-        if (buildings := await self.get_city_buildings(guild, conn=conn)):
-            atkmultiply += buildings["raid_building"] * Decimal("0.1")
-            defmultiply += buildings["raid_building"] * Decimal("0.1")
-        if self.in_class_line(classes, "Raider"):
-            atkmultiply = atkmultiply + Decimal("0.1") * self.get_class_grade_from(
-                classes, "Raider"
+        buildings = await self.get_city_buildings(guild, conn=conn)
+        if local:
+            await self.pool.release(conn)
+        return self.apply_raid_multipliers(
+            damage,
+            armor,
+            atkmultiply,
+            defmultiply,
+            classes,
+            buildings["raid_building"] if buildings else 0,
+        )
+
+    async def get_raidstats_bulk(self, users, god=None, conn=None):
+        """
+        Generates the raidstats for many users at once
+        Users without a character (or not following god if given) are left out
+        """
+        local = False
+        if conn is None:
+            conn = await self.pool.acquire()
+            local = True
+        ids = [
+            u.id if isinstance(u, (discord.Member, discord.User)) else u for u in users
+        ]
+        profiles = await self.cache.get_profiles(ids, conn=conn)
+        if god is not None:
+            profiles = {k: v for k, v in profiles.items() if v["god"] == god}
+        items = {
+            row["owner"]: row
+            for row in await conn.fetch(
+                'SELECT ai."owner", SUM(ai."damage") AS "damage", SUM(ai."armor") AS'
+                ' "armor" FROM allitems ai JOIN inventory i ON (ai."id"=i."item")'
+                ' WHERE i."equipped" IS TRUE AND ai."owner"=ANY($1) GROUP BY'
+                ' ai."owner";',
+                list(profiles),
             )
-        dmg = damage * atkmultiply
-        if self.in_class_line(classes, "Raider"):
-            defmultiply = defmultiply + Decimal("0.1") * self.get_class_grade_from(
-                classes, "Raider"
+        }
+        raid_buildings = {
+            row["id"]: row["raid_building"]
+            for row in await conn.fetch(
+                'SELECT DISTINCT ON (g."id") g."id", c."raid_building" FROM guild g'
+                ' JOIN city c ON c."owner"=g."alliance" WHERE g."id"=ANY($1);',
+                list({p["guild"] for p in profiles.values() if p["guild"]}),
             )
-        deff = armor * defmultiply
+        }
         if local:
             await self.pool.release(conn)
-        return dmg, deff
+
+        stats = {}
+        for user, id_ in zip(users, ids):
+            if (profile := profiles.get(id_)) is None:
+                continue
+            damage, armor = self.get_stat_bonuses(profile["class"], profile["race"])
+            if (row := items.get(id_)) is not None:
+                damage += row["damage"]
+                armor += row["armor"]
+            stats[user] = self.apply_raid_multipliers(
+                damage,
+                armor,
+                profile["atkmultiply"],
+                profile["defmultiply"],
+                profile["class"],
+                raid_buildings.get(profile["guild"], 0),
+            )
+        return stats
+
+    def apply_raid_multipliers(
+        self, damage, armor, atkmultiply, defmultiply, classes, raid_building
+    ):
+        """Applies city and Raider class multipliers to a user's damage and armor"""
+        atkmultiply += raid_building * Decimal("0.1")
+        defmultiply += raid_building * Decimal("0.1")
+        if self.in_class_line(classes, "Raider"):
+            grade = self.get_class_grade_from(classes, "Raider")
+            atkmultiply += Decimal("0.1") * grade
+            defmultiply += Decimal("0.1") * grade
+        return damage * atkmultiply, armor * defmultiply
 
     async def get_equipped_items_for(self, thing, conn=None):
         """Fetches a list of equipped items of a user from the database"""
@@ -260,11 +385,7 @@ class Bot(commands.AutoShardedBot):
         if conn is None:
             conn = await self.pool.acquire()
             local = True
-        items = await conn.fetch(
-            "SELECT ai.* FROM profile p JOIN allitems ai ON (p.user=ai.owner) JOIN"
-            " inventory i ON (ai.id=i.item) WHERE i.equipped IS TRUE AND p.user=$1;",
-            v,
-        )
+        items = await queries.fetch(conn, "get_equipped_items", v)
         if local:
             await self.pool.release(conn)
         return items
@@ -282,6 +403,27 @@ class Bot(commands.AutoShardedBot):
         """Overrides the default Context with a custom Context"""
         return await super().get_context(message, cls=Context)
 
+    def build_prefixes(self):
+        """
+        Precomputes the prefixes of every guild with a custom prefix
+        Needs to be called once the bot user is known
+        """
+        mentions = (f"<@{self.user.id}> ", f"<@!{self.user.id}> ")
+        self.default_prefixes = (*mentions, self.config.global_prefix)
+        self.prefix_tuples = {
+            guild_id: (*mentions, prefix)
+            for guild_id, prefix in self.all_prefixes.items()
+        }
+
+    def set_prefix(self, guild_id, prefix):
+        """Sets a guild's custom prefix, None or the global prefix resets it"""
+        if prefix is None or prefix == self.config.global_prefix:
+            self.all_prefixes.pop(guild_id, None)
+            self.prefix_tuples.pop(guild_id, None)
+        else:
+            self.all_prefixes[guild_id] = prefix
+            self.prefix_tuples[guild_id] = (*self.default_prefixes[:-1], prefix)
+
     def _get_prefix(self, bot, message):
         """
         Returns the prefix for a message
@@ -291,12 +433,7 @@ class Bot(commands.AutoShardedBot):
         """
         if not message.guild:
             return self.config.global_prefix  # Use global prefix in DMs
-        try:
-            return commands.when_mentioned_or(self.all_prefixes[message.guild.id])(
-                self, message
-            )
-        except KeyError:
-            return commands.when_mentioned_or(self.config.global_prefix)(self, message)
+        return self.prefix_tuples.get(message.guild.id, self.default_prefixes)
 
     async def wait_for_dms(self, event, check, timeout=30):
         """
@@ -345,14 +482,12 @@ class Bot(commands.AutoShardedBot):
 
     async def reset_cooldown(self, ctx):
         """Resets someone's cooldown for a Context"""
-        await self.redis.execute(
-            "DEL", f"cd:{ctx.author.id}:{ctx.command.qualified_name}"
-        )
+        await self.cooldowns.reset("cd", ctx.author.id, ctx.command.qualified_name)
 
     async def reset_guild_cooldown(self, ctx):
         """Resets a guild's cooldown for a Context"""
-        await self.redis.execute(
-            "DEL", f"guildcd:{ctx.character_data['guild']}:{ctx.command.qualified_name}"
+        await self.cooldowns.reset(
+            "guildcd", ctx.character_data["guild"], ctx.command.qualified_name
         )
 
     async def reset_alliance_cooldown(self, ctx):
@@ -360,9 +495,7 @@ class Bot(commands.AutoShardedBot):
         alliance = await self.pool.fetchval(
             'SELECT alliance FROM guild WHERE "id"=$1;', ctx.character_data["guild"]
         )
-        await self.redis.execute(
-            "DEL", f"alliancecd:{alliance}:{ctx.command.qualified_name}"
-        )
+        await self.cooldowns.reset("alliancecd", alliance, ctx.command.qualified_name)
 
     async def set_cooldown(
         self, ctx_or_user_id: Union[Context, int], cooldown: int, identifier: str = None
@@ -377,13 +510,7 @@ class Bot(commands.AutoShardedBot):
         else:
             user_id = ctx_or_user_id
 
-        await self.redis.execute(
-            "SET",
-            f"cd:{user_id}:{cmd_id}",
-            cmd_id,
-            "EX",
-            cooldown,
-        )
+        await self.cooldowns.set("cd", user_id, cmd_id, cooldown)
 
     async def activate_booster(self, user, type_):
         """Activates a boost of type_ for a user"""
@@ -398,24 +525,56 @@ class Bot(commands.AutoShardedBot):
         val = await self.redis.execute("TTL", f"booster:{user}:{type_}")
         return datetime.timedelta(seconds=val) if val != -2 else None
 
+    async def _start_adventure(self, key, number, time):
+        """Stores an adventure's number and the timestamp it ends at"""
+        end = int(datetime.datetime.now().timestamp() + time.total_seconds())
+        await self.redis.execute(
+            "SET",
+            key,
+            f"{number}:{end}",
+            "EX",
+            int(time.total_seconds()) + ADVENTURE_RETENTION,
+        )
+
+    async def _get_adventures(self, keys):
+        """Returns the (number, time left, done) of adventures in one round trip"""
+        values = await self.redis.execute("MGET", *keys)
+        now = datetime.datetime.now().timestamp()
+        adventures = []
+        for key, value in zip(keys, values):
+            if value is None:
+                adventures.append(None)
+                continue
+            num, sep, end = value.decode("ascii").partition(":")
+            if sep:
+                time = datetime.timedelta(seconds=int(end) - int(now))
+            else:
+                # Adventures started before the end was stored in the value
+                ttl = await self.redis.execute("TTL", key)
+                time = datetime.timedelta(seconds=ttl - ADVENTURE_RETENTION)
+            adventures.append((int(num), time, time.total_seconds() <= 0))
+        return adventures
+
     async def start_adventure(self, user, number, time):
         """Sends a user on an adventure"""
         user = user.id if isinstance(user, (discord.User, discord.Member)) else user
-        await self.redis.execute(
-            "SET", f"adv:{user}", number, "EX", int(time.total_seconds()) + 259_200
-        )  # +3 days
+        await self._start_adventure(f"adv:{user}", number, time)
 
     async def get_adventure(self, user):
         """Returns a user's adventure"""
         user = user.id if isinstance(user, (discord.User, discord.Member)) else user
-        ttl = await self.redis.execute("TTL", f"adv:{user}")
-        if ttl == -2:
-            return
-        num = await self.redis.execute("GET", f"adv:{user}")
-        ttl = ttl - 259_200
-        done = ttl <= 0
-        time = datetime.timedelta(seconds=ttl)
-        return int(num.decode("ascii")), time, done
+        return (await self._get_adventures([f"adv:{user}"]))[0]
+
+    async def get_adventures(self, users):
+        """Returns the adventures of many users by user ID"""
+        users = [
+            user.id if isinstance(user, (discord.User, discord.Member)) else user
+            for user in users
+        ]
+        if not users:
+            return {}
+        adventures = await self._get_adventures([f"adv:{user}" for user in users])
+        return dict(zip(users, adventures))
 
     async def delete_adventure(self, user):
         """Deletes a user's adventure"""
@@ -445,23 +604,10 @@ class Bot(commands.AutoShardedBot):
             )
 
     async def start_guild_adventure(self, guild, difficulty, time):
-        await self.redis.execute(
-            "SET",
-            f"guildadv:{guild}",
-            difficulty,
-            "EX",
-            int(time.total_seconds()) + 259_200,
-        )  # +3 days
+        await self._start_adventure(f"guildadv:{guild}", difficulty, time)
 
     async def get_guild_adventure(self, guild):
-        ttl = await self.redis.execute("TTL", f"guildadv:{guild}")
-        if ttl == -2:
-            return
-        num = await self.redis.execute("GET", f"guildadv:{guild}")
-        ttl = ttl - 259_200
-        done = ttl <= 0
-        time = datetime.timedelta(seconds=ttl)
-        return int(num.decode("ascii")), time, done
+        return (await self._get_adventures([f"guildadv:{guild}"]))[0]
 
     async def delete_guild_adventure(self, guild):
         await self.redis.execute("DEL", f"guildadv:{guild}")
@@ -495,6 +641,51 @@ class Bot(commands.AutoShardedBot):
             await self.pool.release(conn)
         return item
 
+    async def create_items_bulk(self, items, equipped=False, conn=None):
+        """
+        Creates many items with a single statement
+        items are dicts with the arguments of create_item
+        Returns the new items in the same order
+        """
+        # RETURNING has no defined order, so the ids are drawn for the numbered
+        # input rows first and the result is sorted by that number
+        if not items:
+            return []
+        if conn is None:
+            conn = await self.pool.acquire()
+            local = True
+        else:
+            local = False
+        owners = [
+            i["owner"].id
+            if isinstance(i["owner"], (discord.User, discord.Member))
+            else i["owner"]
+            for i in items
+        ]
+        new_items = await conn.fetch(
+            "WITH new_rows AS (SELECT nextval('allitems_id_seq') AS \"id\", * FROM"
+            " unnest($1::bigint[], $2::varchar[], $3::integer[], $4::varchar[],"
+            " $5::numeric[], $6::numeric[], $7::varchar[]) WITH ORDINALITY AS"
+            ' i("owner", "name", "value", "type", "damage", "armor", "hand",'
+            ' "idx")), new_items AS (INSERT INTO allitems ("id", "owner", "name",'
+            ' "value", "type", "damage", "armor", "hand") SELECT "id", "owner",'
+            ' "name", "value", "type", "damage", "armor", "hand" FROM new_rows'
+            ' RETURNING *), new_inventory AS (INSERT INTO inventory ("item",'
+            ' "equipped") SELECT "id", $8 FROM new_items) SELECT new_items.* FROM'
+            ' new_items JOIN new_rows USING ("id") ORDER BY new_rows."idx";',
+            owners,
+            [i["name"] for i in items],
+            [i["value"] for i in items],
+            [i["type_"] for i in items],
+            [i["damage"] for i in items],
+            [i["armor"] for i in items],
+            [i["hand"] for i in items],
+            equipped,
+        )
+        if local:
+            await self.pool.release(conn)
+        return new_items
+
     async def create_random_item(
         self, minstat, maxstat, minvalue, maxvalue, owner, insert=True, conn=None
     ):
@@ -590,11 +781,7 @@ class Bot(commands.AutoShardedBot):
             )
         elif reward == "money":
             money = new_level * 1000
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                money,
-                ctx.author.id,
-            )
+            await queries.execute(conn, "add_money", money, ctx.author.id)
             await self.cache.update_profile_cols_rel(ctx.author.id, money=money)
             await self.log_transaction(
                 ctx,
@@ -624,31 +811,27 @@ class Bot(commands.AutoShardedBot):
             ).format(new_level=new_level, reward=reward_text, additional=additional)
         )
 
+    def load_class_tables(self):
+        """(Re)builds the class line and grade lookups from the config"""
+        self.class_lines, self.class_grades = make_class_tables(self.config.classes)
+
     def in_class_line(self, classes, line):
-        return any([self.get_class_line(c) == line for c in classes])
+        return any(self.class_lines.get(c) == line for c in classes)
 
     def get_class_grade_from(self, classes, line):
         for class_ in classes:
-            if self.get_class_line(class_) == line:
-                return self.get_class_grade(class_)
+            if self.class_lines.get(class_) == line:
+                return self.class_grades[class_]
         return None
 
     def get_class_line(self, class_):
-        for line, evos in self.config.classes.items():
-            if class_ in evos:
-                return line
-        return "None"
+        return self.class_lines.get(class_, "None")
 
     def get_class_evolves(self):
         return {line: evos[1:] for line, evos in self.config.classes.items()}
 
     def get_class_grade(self, class_):
-        for line, evos in self.config.classes.items():
-            try:
-                return evos.index(class_) + 1
-            except ValueError:
-                pass
-        return 0
+        return self.class_grades.get(class_, 0)
 
     async def clear_donator_cache(self, user):
         user = user if isinstance(user, int) else user.id
@@ -678,30 +861,12 @@ class Bot(commands.AutoShardedBot):
         if not classes or not race:
             row = await self.cache.get_profile(user, conn=conn)
             classes, race = row["class"], row["race"]
-        lines = [self.get_class_line(class_) for class_ in classes]
-        grades = [self.get_class_grade(class_) for class_ in classes]
-        for line, grade in zip(lines, grades):
-            if line == "Mage":
-                damage += grade
-            elif line == "Warrior":
-                armor += grade
-            elif line == "Paragon":
-                damage += grade
-                armor += grade
-        if race == "Human":
-            damage += 2
-            armor += 2
-        elif race == "Dwarf":
-            damage += 1
-            armor += 3
-        elif race == "Elf":
-            damage += 3
-            armor += 1
-        elif race == "Orc":
-            armor += 4
-        elif race == "Jikill":
-            damage += 4
-        return damage, armor
+        damage_bonus, armor_bonus = self.get_stat_bonuses(classes, race)
+        return damage + damage_bonus, armor + armor_bonus
+
+    def get_stat_bonuses(self, classes, race):
+        """Returns the damage and armor a user gets from their classes and race"""
+        return stat_bonuses(classes, race, self.class_lines, self.class_grades)
 
     async def start_joins(self):
         id_ = "".join(random.choice(string.ascii_letters) for i in range(7))
@@ -761,37 +926,25 @@ Subject: {subject}
 Command: {ctx.command.qualified_name}
 {data_}"""
 
-        if conn is None:
-            conn = await self.pool.acquire()
-            local = True
-        else:
-            local = False
-        await conn.execute(
-            'INSERT INTO transactions ("from", "to", "subject", "info",'
-            ' "timestamp") VALUES ($1, $2, $3, $4, $5);',
-            from_,
-            to,
-            subject,
-            description,
-            timestamp,
+        await self.transaction_log.add(
+            "transactions", (from_, to, subject, description, timestamp), conn=conn
         )
         if subject == "shop":
-            await conn.execute(
-                'INSERT INTO market_history ("item", "name", "value", "type",'
-                ' "damage", "armor", "signature", "price", "offer") VALUES ($1, $2,'
-                " $3, $4, $5, $6, $7, $8, $9);",
-                data["id"],
-                data["name"],
-                data["value"],
-                data["type"],
-                data["damage"],
-                data["armor"],
-                data["signature"],
-                data["price"],
-                data["offer"],
+            await self.transaction_log.add(
+                "market_history",
+                (
+                    data["id"],
+                    data["name"],
+                    data["value"],
+                    data["type"],
+                    data["damage"],
+                    data["armor"],
+                    data["signature"],
+                    data["price"],
+                    data["offer"],
+                ),
+                conn=conn,
             )
-        if local:
-            await self.pool.release(conn)
 
     async def public_log(self, event: str):
         await self.http.send_message(self.config.bot_event_channel, event)
@@ -822,6 +975,7 @@ Command: {ctx.command.qualified_name}
         await conn.execute('DELETE FROM user_settings WHERE "user"=$1;', user)
         await conn.execute('DELETE FROM loot WHERE "user"=$1;', user)
         await conn.execute('DELETE FROM profile WHERE "user"=$1;', user)
+        await self.cache.remove_from_leaderboards(user)
         if local:
             await self.pool.release(conn)
 
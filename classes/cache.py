@@ -15,12 +15,30 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
 import decimal
+import hashlib
 
+from contextlib import contextmanager
+
+import aioredis
 import asyncpg
 import orjson
 
+from lru import LRU
+
+from classes import queries
+
 DECIMAL_COLUMNS = ("atkmultiply", "defmultiply", "luck")
+LEADERBOARD_COLUMNS = ("money", "xp", "pvpwins", "lovescore")
+# Set once the leaderboards were fully loaded from Postgres, until then they
+# only hold whoever happened to be loaded and must not be read
+LEADERBOARDS_BUILT = "leaderboard:built"
+# Held while the leaderboards are rebuilt, users whose scores change in the
+# meantime are only added to the dirty set and replayed afterwards
+LEADERBOARDS_REBUILDING = "leaderboard:rebuilding"
+LEADERBOARDS_DIRTY = "leaderboard:dirty"
+REBUILD_TIMEOUT = 600
 
 
 def default(obj):
@@ -34,10 +52,133 @@ def default(obj):
 
 def fix(json):
     for col in DECIMAL_COLUMNS:
-        json[col] = decimal.Decimal(json[col])
+        if col in json:
+            json[col] = decimal.Decimal(json[col])
     return json
 
 
+def encode_field(key, value):
+    """Encodes a profile column for storage in a Redis hash field"""
+    if key in DECIMAL_COLUMNS:
+        # stored raw so HINCRBYFLOAT can operate on it
+        return str(value)
+    return orjson.dumps(value, default=default)
+
+
+def decode_field(key, value):
+    """Decodes a Redis hash field back into the profile column's value"""
+    if key in DECIMAL_COLUMNS:
+        return decimal.Decimal(value.decode())
+    return orjson.loads(value)
+
+
+def encode_profile(row):
+    """Flattens a profile into HSET arguments"""
+    args = []
+    for key, value in dict(row).items():
+        args.extend((key, encode_field(key, value)))
+    return args
+
+
+def decode_profile(flat):
+    """Turns a flat HGETALL reply into a profile dict"""
+    data = {}
+    it = iter(flat)
+    for key, value in zip(it, it):
+        key = key.decode()
+        data[key] = decode_field(key, value)
+    return data
+
+
+# Applies a list of (op, field, value) triples to a cached profile hash
+# atomically. Profiles that are not cached are left alone, just like before.
+# op is "i" for HINCRBY, "f" for HINCRBYFLOAT and "s" for HSET.
+# KEYS[2:] are the leaderboards of touched columns, ARGV[1] is the user ID.
+# They get the new value from the hash, or the change itself if not cached.
+UPDATE_PROFILE_SCRIPT = """
+local member = ARGV[1]
+local boards = {}
+for i = 2, #KEYS do
+    boards[string.sub(KEYS[i], 13)] = KEYS[i]
+end
+local cached = redis.call("EXISTS", KEYS[1]) == 1
+local rebuilding = redis.call("EXISTS", "leaderboard:rebuilding") == 1
+for i = 2, #ARGV, 3 do
+    local op, field, val = ARGV[i], ARGV[i + 1], ARGV[i + 2]
+    if cached then
+        if op == "i" then
+            redis.call("HINCRBY", KEYS[1], field, val)
+        elseif op == "f" then
+            redis.call("HINCRBYFLOAT", KEYS[1], field, val)
+        else
+            redis.call("HSET", KEYS[1], field, val)
+        end
+    end
+    local board = boards[field]
+    if board then
+        if rebuilding then
+            redis.call("SADD", "leaderboard:dirty", member)
+        elseif cached then
+            local score = tonumber(redis.call("HGET", KEYS[1], field))
+            if score then
+                redis.call("ZADD", board, score, member)
+            end
+        elseif op == "s" then
+            if tonumber(val) then
+                redis.call("ZADD", board, val, member)
+            end
+        else
+            redis.call("ZADD", board, "XX", "INCR", val, member)
+        end
+    end
+end
+if cached then
+    return 1
+end
+return 0
+"""
+UPDATE_PROFILE_SCRIPT_SHA = hashlib.sha1(UPDATE_PROFILE_SCRIPT.encode()).hexdigest()
+
+# Sets a user's scores, KEYS are the leaderboards, ARGV[1] is the user ID
+# and ARGV[2:] are the scores in the same order.
+SET_SCORES_SCRIPT = """
+if redis.call("EXISTS", "leaderboard:rebuilding") == 1 then
+    redis.call("SADD", "leaderboard:dirty", ARGV[1])
+    return 0
+end
+for i = 1, #KEYS do
+    redis.call("ZADD", KEYS[i], ARGV[i + 1], ARGV[1])
+end
+return 1
+"""
+SET_SCORES_SCRIPT_SHA = hashlib.sha1(SET_SCORES_SCRIPT.encode()).hexdigest()
+
+# Removes users from the leaderboards, KEYS are the leaderboards and ARGV
+# the user IDs.
+REMOVE_SCORES_SCRIPT = """
+if redis.call("EXISTS", "leaderboard:rebuilding") == 1 then
+    redis.call("SADD", "leaderboard:dirty", unpack(ARGV))
+    return 0
+end
+for i = 1, #KEYS do
+    redis.call("ZREM", KEYS[i], unpack(ARGV))
+end
+return 1
+"""
+REMOVE_SCORES_SCRIPT_SHA = hashlib.sha1(REMOVE_SCORES_SCRIPT.encode()).hexdigest()
+
+# Ends a rebuild unless users changed since the last replay.
+FINISH_REBUILD_SCRIPT = """
+if redis.call("SCARD", "leaderboard:dirty") > 0 then
+    return 0
+end
+redis.call("DEL", "leaderboard:rebuilding")
+redis.call("SET", "leaderboard:built", 1)
+return 1
+"""
+FINISH_REBUILD_SCRIPT_SHA = hashlib.sha1(FINISH_REBUILD_SCRIPT.encode()).hexdigest()
+
+
 class FakeRecord(object):
     """
     Object to mimic asyncpg.Record behavior.
@@ -62,94 +203,418 @@ class FakeRecord(object):
         raise ValueError
 
 
+def copy_profile(data):
+    """Copies a decoded profile so callers can't mutate the cached lists"""
+    return {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+
+
 class RedisCache:
     """
     Read-only cache forwarder to Redis.
     It is mainly responsible for profile data for now.
+
+    Decoded profiles are additionally kept in a small in-process LRU
+    which is invalidated across all clusters via the shard pub/sub channel.
     """
 
     def __init__(self, bot):
+        self.bot = bot
         self.redis = bot.redis
         self.postgres = bot.pool
+        self.local = LRU(bot.config.profile_cache_size)
+        # how many loads of a user's profile are running, and how often the
+        # profile was invalidated since the first of them started
+        self.loading = {}
+        self.invalidations = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        """Returns the hits and misses of the in-process cache"""
+        return self.hits, self.misses
 
-    async def get_profile(self, user_id, conn=None):
+    def invalidate_local(self, *user_ids):
+        """Drops profiles from this cluster's in-process cache only"""
+        for user_id in user_ids:
+            try:
+                del self.local[user_id]
+            except KeyError:
+                pass
+            if user_id in self.loading:
+                self.invalidations[user_id] = self.invalidations.get(user_id, 0) + 1
+
+    @contextmanager
+    def _loading(self, user_ids):
+        """
+        Tracks invalidations while profiles are loaded from Redis or Postgres.
+        Yields a function that tells whether a user's loaded profile is still
+        current and may be put into the in-process cache.
         """
-        Gets the profile database entry for a user, preferably from Redis.
+        versions = {}
+        for user_id in user_ids:
+            self.loading[user_id] = self.loading.get(user_id, 0) + 1
+            versions[user_id] = self.invalidations.get(user_id, 0)
+        try:
+            yield lambda i: self.invalidations.get(i, 0) == versions[i]
+        finally:
+            for user_id in user_ids:
+                if count := self.loading[user_id] - 1:
+                    self.loading[user_id] = count
+                else:
+                    del self.loading[user_id]
+                    self.invalidations.pop(user_id, None)
+
+    async def invalidate(self, *user_ids):
+        """Drops profiles from the in-process cache of every cluster"""
+        self.invalidate_local(*user_ids)
+        if (sharding := self.bot.get_cog("Sharding")) is not None:
+            await sharding.handler(
+                "invalidate_profile_cache", 0, args={"user_ids": list(user_ids)}
+            )
+
+    async def get_profile(self, user_id, conn=None, columns=None):
+        """
+        Gets the profile database entry for a user, preferably from memory or Redis.
         If it is not in Redis, it gets the data from Postgres and inserts to Redis.
+        If columns are given, only those are fetched from Redis.
         """
-        row = await self.redis.execute("GET", f"profilecache:{user_id}")
-        if row is None:
-            if conn is None:
-                conn = await self.postgres.acquire()
-                local = True
+        if (data := self.local.get(user_id)) is not None:
+            self.hits += 1
+            if columns is not None:
+                data = {col: data[col] for col in columns}
+            return FakeRecord(copy_profile(data))
+        self.misses += 1
+        if columns is not None:
+            values = await self.redis.execute("HMGET", f"profile:{user_id}", *columns)
+            if all(value is not None for value in values):
+                return FakeRecord(
+                    {
+                        col: decode_field(col, value)
+                        for col, value in zip(columns, values)
+                    }
+                )
+            profile = await self._load_profile(user_id, conn)
+            if profile is None:
+                return None
+            return FakeRecord({col: profile[col] for col in columns})
+        return await self._load_profile(user_id, conn)
+
+    async def _load_profile(self, user_id, conn):
+        """Loads a profile missing in memory for get_profile"""
+        with self._loading((user_id,)) as current:
+            row = await self.redis.execute("HGETALL", f"profile:{user_id}")
+            if not row:
+                if conn is None:
+                    conn = await self.postgres.acquire()
+                    local = True
+                else:
+                    local = False
+
+                row = await queries.fetchrow(conn, "get_profile", user_id)
+
+                if local:
+                    await self.postgres.release(conn)
+
+                if row is None:
+                    return None
+                async with self.redis.get() as redis:
+                    await asyncio.gather(
+                        redis.execute(
+                            "HSET", f"profile:{user_id}", *encode_profile(row)
+                        ),
+                        self._add_to_leaderboards(redis, row),
+                    )
+                if current(user_id):
+                    self.local[user_id] = copy_profile(dict(row))
+                return row
+            loaded = decode_profile(row)
+            if current(user_id):
+                self.local[user_id] = loaded
+            return FakeRecord(copy_profile(loaded))
+
+    async def get_profiles(self, user_ids, conn=None):
+        """
+        Gets the profiles for many users at once, preferably from memory or Redis.
+        Redis is queried in a single pipeline, all misses are fetched from
+        Postgres in one query and written back to Redis in another pipeline.
+        Returns a dict mapping user IDs to profiles, users without one are omitted.
+        """
+        profiles = {}
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            if (data := self.local.get(user_id)) is not None:
+                self.hits += 1
+                profiles[user_id] = FakeRecord(copy_profile(data))
+            else:
+                self.misses += 1
+                missing.append(user_id)
+        if not missing:
+            return profiles
+
+        with self._loading(missing) as current:
+            return await self._load_profiles(missing, profiles, current, conn)
+
+    async def _load_profiles(self, missing, profiles, current, conn):
+        """Loads the profiles missing in memory into profiles for get_profiles"""
+        async with self.redis.get() as redis:
+            rows = await asyncio.gather(
+                *[redis.execute("HGETALL", f"profile:{i}") for i in missing]
+            )
+        uncached = []
+        for user_id, row in zip(missing, rows):
+            if row:
+                loaded = decode_profile(row)
+                if current(user_id):
+                    self.local[user_id] = loaded
+                profiles[user_id] = FakeRecord(copy_profile(loaded))
             else:
-                local = False
+                uncached.append(user_id)
+        if not uncached:
+            return profiles
+
+        if conn is None:
+            conn = await self.postgres.acquire()
+            local = True
+        else:
+            local = False
+
+        rows = await queries.fetch(conn, "get_profiles", uncached)
+
+        if local:
+            await self.postgres.release(conn)
+
+        if rows:
+            async with self.redis.get() as redis:
+                await asyncio.gather(
+                    *[
+                        redis.execute(
+                            "HSET", f"profile:{row['user']}", *encode_profile(row)
+                        )
+                        for row in rows
+                    ],
+                    *[self._add_to_leaderboards(redis, row) for row in rows],
+                )
+        for row in rows:
+            if current(row["user"]):
+                self.local[row["user"]] = copy_profile(dict(row))
+            profiles[row["user"]] = row
+        return profiles
+
+    async def _eval(self, redis, script, sha, keys, args):
+        """Runs a Lua script, loading it into Redis if it isn't yet"""
+        try:
+            return await redis.execute("EVALSHA", sha, len(keys), *keys, *args)
+        except aioredis.ReplyError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            return await redis.execute("EVAL", script, len(keys), *keys, *args)
+
+    async def _update_profile(self, user_id, ops):
+        """Runs the update script on a profile and its leaderboards"""
+        keys = [f"profile:{user_id}"]
+        keys.extend(
+            f"leaderboard:{field}"
+            for field in ops[1::3]
+            if field in LEADERBOARD_COLUMNS
+        )
+        await self._eval(
+            self.redis,
+            UPDATE_PROFILE_SCRIPT,
+            UPDATE_PROFILE_SCRIPT_SHA,
+            keys,
+            (user_id, *ops),
+        )
+        await self.invalidate(user_id)
+
+    async def _add_to_leaderboards(self, redis, row):
+        """Sets a freshly loaded profile's scores on all leaderboards"""
+        await self._eval(
+            redis,
+            SET_SCORES_SCRIPT,
+            SET_SCORES_SCRIPT_SHA,
+            [f"leaderboard:{col}" for col in LEADERBOARD_COLUMNS],
+            (row["user"], *[row[col] or 0 for col in LEADERBOARD_COLUMNS]),
+        )
+
+    async def get_rank(self, user_id, column):
+        """
+        Returns a user's 1-based position on a leaderboard
+        None if the user is not on it or the leaderboards are not built yet
+        """
+        async with self.redis.get() as redis:
+            built, rank = await asyncio.gather(
+                redis.execute("EXISTS", LEADERBOARDS_BUILT),
+                redis.execute("ZREVRANK", f"leaderboard:{column}", user_id),
+            )
+        if not built or rank is None:
+            return None
+        return rank + 1
+
+    async def get_top(self, column, count=10):
+        """
+        Returns the IDs of the top users on a leaderboard
+        The list is empty if the leaderboards are not built yet
+        """
+        async with self.redis.get() as redis:
+            built, ids = await asyncio.gather(
+                redis.execute("EXISTS", LEADERBOARDS_BUILT),
+                redis.execute("ZREVRANGE", f"leaderboard:{column}", 0, count - 1),
+            )
+        if not built:
+            return []
+        return [int(i) for i in ids]
 
-            row = await conn.fetchrow('SELECT * FROM profile WHERE "user"=$1;', user_id)
+    async def remove_from_leaderboards(self, *user_ids):
+        """Removes users from all leaderboards, e.g. after deleting their profile"""
+        await self._eval(
+            self.redis,
+            REMOVE_SCORES_SCRIPT,
+            REMOVE_SCORES_SCRIPT_SHA,
+            [f"leaderboard:{col}" for col in LEADERBOARD_COLUMNS],
+            user_ids,
+        )
+
+    async def ensure_leaderboards(self):
+        """Rebuilds the leaderboards if they were never fully built"""
+        if not await self.redis.execute("EXISTS", LEADERBOARDS_BUILT):
+            await self.rebuild_leaderboards()
+
+    async def rebuild_leaderboards(self, conn=None, chunk_size=10000):
+        """
+        Bulk loads all leaderboards from Postgres.
+        The sets are built under temporary keys and swapped in atomically.
+        Score changes while this runs are held back and replayed afterwards.
+        Returns the number of profiles or None if a rebuild is already running.
+        """
+        if not await self.redis.execute(
+            "SET", LEADERBOARDS_REBUILDING, 1, "NX", "EX", REBUILD_TIMEOUT
+        ):
+            return None
+        await self.redis.execute("DEL", LEADERBOARDS_BUILT, LEADERBOARDS_DIRTY)
+
+        if conn is None:
+            conn = await self.postgres.acquire()
+            local = True
+        else:
+            local = False
+
+        try:
+            rows = await conn.fetch(
+                'SELECT "user", "money", "xp", "pvpwins", "lovescore" FROM profile;'
+            )
+
+            async with self.redis.get() as redis:
+                for col in LEADERBOARD_COLUMNS:
+                    await redis.execute(
+                        "EXPIRE", LEADERBOARDS_REBUILDING, REBUILD_TIMEOUT
+                    )
+                    tmp = f"leaderboard:{col}:rebuild"
+                    await redis.execute("DEL", tmp)
+                    for i in range(0, len(rows), chunk_size):
+                        args = []
+                        for row in rows[i : i + chunk_size]:
+                            args.extend((row[col] or 0, row["user"]))
+                        await redis.execute("ZADD", tmp, *args)
+                    if rows:
+                        await redis.execute("RENAME", tmp, f"leaderboard:{col}")
+                    else:
+                        await redis.execute("DEL", f"leaderboard:{col}")
 
+                while not await self._eval(
+                    redis, FINISH_REBUILD_SCRIPT, FINISH_REBUILD_SCRIPT_SHA, [], ()
+                ):
+                    dirty = await redis.execute("SPOP", LEADERBOARDS_DIRTY, chunk_size)
+                    await self._replay_scores(redis, conn, [int(i) for i in dirty])
+        except BaseException:
+            # leaves the leaderboards unbuilt, so they are not read
+            await self.redis.execute("DEL", LEADERBOARDS_REBUILDING)
+            raise
+        finally:
             if local:
                 await self.postgres.release(conn)
+        return len(rows)
 
-            if row is None:
-                return None
-            await self.redis.execute(
-                "SET",
-                f"profilecache:{user_id}",
-                orjson.dumps(dict(row), default=default),
+    async def _replay_scores(self, redis, conn, user_ids):
+        """
+        Sets the current scores of users that changed during a rebuild
+        Cached profiles are the source like for regular updates, the others
+        are read from Postgres.
+        """
+        cached = await asyncio.gather(
+            *[
+                redis.execute("HMGET", f"profile:{i}", *LEADERBOARD_COLUMNS)
+                for i in user_ids
+            ]
+        )
+        scores = {}
+        for user_id, values in zip(user_ids, cached):
+            if all(value is not None for value in values):
+                scores[user_id] = [
+                    decode_field(col, value) or 0
+                    for col, value in zip(LEADERBOARD_COLUMNS, values)
+                ]
+        if uncached := [i for i in user_ids if i not in scores]:
+            rows = await conn.fetch(
+                'SELECT "user", "money", "xp", "pvpwins", "lovescore" FROM profile'
+                ' WHERE "user"=ANY($1);',
+                uncached,
             )
-            return row
-        loaded = orjson.loads(row)
-        return FakeRecord(loaded)
+            for row in rows:
+                scores[row["user"]] = [row[col] or 0 for col in LEADERBOARD_COLUMNS]
+        await asyncio.gather(
+            *[
+                redis.execute("ZADD", f"leaderboard:{col}", score[idx], user_id)
+                for user_id, score in scores.items()
+                for idx, col in enumerate(LEADERBOARD_COLUMNS)
+            ],
+            *[
+                redis.execute("ZREM", f"leaderboard:{col}", user_id)
+                for user_id in user_ids
+                if user_id not in scores
+                for col in LEADERBOARD_COLUMNS
+            ],
+        )
 
     async def update_profile_cols_rel(self, user_id, **vals):
         """
         Updates profile columns in the cache by a relative difference.
         """
-        row = await self.redis.execute("GET", f"profilecache:{user_id}")
-        if row is None:
-            return None
-        row = fix(orjson.loads(row))
+        ops = []
         for key, val in vals.items():
             key = key.rstrip("_")
-            if isinstance(val, (int, float, decimal.Decimal)):
-                new_val = row[key] + val
+            if isinstance(val, bool):
+                ops.extend(("s", key, encode_field(key, val)))
+            elif isinstance(val, int) and key not in DECIMAL_COLUMNS:
+                ops.extend(("i", key, val))
+            elif isinstance(val, (int, float, decimal.Decimal)):
+                ops.extend(("f", key, str(val)))
             else:
-                new_val = val
-            row[key] = new_val
-        await self.redis.execute(
-            "SET",
-            f"profilecache:{user_id}",
-            orjson.dumps(dict(row), default=default),
-        )
+                ops.extend(("s", key, encode_field(key, val)))
+        await self._update_profile(user_id, ops)
 
     async def update_profile_cols_abs(self, user_id, **vals):
         """
         Updates profile columns in the cache by an absolute value.
         """
-        row = await self.redis.execute("GET", f"profilecache:{user_id}")
-        if row is None:
-            return None
-        row = orjson.loads(row)
+        ops = []
         for key, val in vals.items():
-            row[key.rstrip("_")] = val
-        await self.redis.execute(
-            "SET",
-            f"profilecache:{user_id}",
-            orjson.dumps(dict(row), default=default),
-        )
+            key = key.rstrip("_")
+            ops.extend(("s", key, encode_field(key, val)))
+        await self._update_profile(user_id, ops)
 
     async def wipe_profile(self, *user_ids):
         """
         Deletes the Redis cache for a profile.
         """
-        user_ids = [f"profilecache:{i}" for i in user_ids]
-        await self.redis.execute("DEL", *user_ids)
+        keys = [f"profile:{i}" for i in user_ids]
+        await self.redis.execute("DEL", *keys)
+        await self.invalidate(*user_ids)
 
     async def get_profile_col(self, user_id, column_name, conn=None):
         """
         Gets a specific column from a user's profile utilizing the cache.
         """
-        profile = await self.get_profile(user_id, conn=conn)
+        profile = await self.get_profile(user_id, conn=conn, columns=(column_name,))
         if profile is None:
             return None
         return profile[column_name]
@@ -31,6 +31,7 @@ from utils.paginator import NoChoice
 
 if TYPE_CHECKING:
     from classes.bot import Bot
+    from classes.profiling import CommandProfile
 
 
 class Context(commands.Context):
@@ -41,6 +42,7 @@ class Context(commands.Context):
     """
 
     bot: "Bot"
+    profile: Optional["CommandProfile"] = None
 
     @property
     def disp(self) -> str:
@@ -0,0 +1,147 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import hashlib
+
+from time import time
+
+import aioredis
+
+# Sets a cooldown key and records its expiry in the owner's index.
+# KEYS[1] is the cooldown key, KEYS[2] the index.
+# ARGV[1] is the command name, ARGV[2] the cooldown, ARGV[3] the current time.
+SET_SCRIPT = """
+local ttl, now = tonumber(ARGV[2]), tonumber(ARGV[3])
+redis.call("SET", KEYS[1], ARGV[1], "EX", ttl)
+redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", now)
+redis.call("ZADD", KEYS[2], now + ttl, ARGV[1])
+if redis.call("TTL", KEYS[2]) < ttl then
+    redis.call("EXPIRE", KEYS[2], ttl)
+end
+return 1
+"""
+
+# Changes the expiry of an existing cooldown, same arguments as above
+EXPIRE_SCRIPT = """
+local ttl, now = tonumber(ARGV[2]), tonumber(ARGV[3])
+if redis.call("EXPIRE", KEYS[1], ttl) == 0 then
+    redis.call("ZREM", KEYS[2], ARGV[1])
+    return 0
+end
+redis.call("ZADD", KEYS[2], now + ttl, ARGV[1])
+if redis.call("TTL", KEYS[2]) < ttl then
+    redis.call("EXPIRE", KEYS[2], ttl)
+end
+return 1
+"""
+
+# Sets a cooldown only if it isn't set yet, same arguments as above.
+# Returns {1, cooldown} if it was set or {0, remaining seconds} if not.
+ACQUIRE_SCRIPT = """
+local ttl, now = tonumber(ARGV[2]), tonumber(ARGV[3])
+if not redis.call("SET", KEYS[1], ARGV[1], "EX", ttl, "NX") then
+    return {0, redis.call("TTL", KEYS[1])}
+end
+redis.call("ZREMRANGEBYSCORE", KEYS[2], "-inf", now)
+redis.call("ZADD", KEYS[2], now + ttl, ARGV[1])
+if redis.call("TTL", KEYS[2]) < ttl then
+    redis.call("EXPIRE", KEYS[2], ttl)
+end
+return {1, ttl}
+"""
+
+SCRIPTS = {
+    script: hashlib.sha1(script.encode()).hexdigest()
+    for script in (SET_SCRIPT, EXPIRE_SCRIPT, ACQUIRE_SCRIPT)
+}
+
+
+class CooldownStore:
+    """
+    Cross-process cooldowns which are stored in Redis.
+
+    Every cooldown is a key like cd:<user>:<command> with an expiry. Next
+    to it, each owner (a user, guild or alliance) has a sorted set of their
+    commands on cooldown scored by the expiry timestamp, so listing them
+    does not need KEYS.
+    """
+
+    def __init__(self, bot):
+        self.redis = bot.redis
+
+    async def _run(self, script, keys, args):
+        """Runs a script, loading it into Redis if it isn't yet"""
+        args = (len(keys), *keys, *args)
+        try:
+            return await self.redis.execute("EVALSHA", SCRIPTS[script], *args)
+        except aioredis.ReplyError as e:
+            if not str(e).startswith("NOSCRIPT"):
+                raise
+            return await self.redis.execute("EVAL", script, *args)
+
+    async def get(self, prefix, owner, name):
+        """Returns the remaining seconds of a cooldown or -2 if it isn't set"""
+        return await self.redis.execute("TTL", f"{prefix}:{owner}:{name}")
+
+    async def set(self, prefix, owner, name, cooldown):
+        """Sets a cooldown or overwrites it if it already exists"""
+        await self._run(
+            SET_SCRIPT,
+            (f"{prefix}:{owner}:{name}", f"{prefix}index:{owner}"),
+            (name, cooldown, int(time())),
+        )
+
+    async def acquire(self, prefix, owner, name, cooldown):
+        """
+        Sets a cooldown if it isn't set yet, atomically.
+        Returns whether it was set and the remaining seconds of the cooldown.
+        """
+        acquired, ttl = await self._run(
+            ACQUIRE_SCRIPT,
+            (f"{prefix}:{owner}:{name}", f"{prefix}index:{owner}"),
+            (name, cooldown, int(time())),
+        )
+        return bool(acquired), ttl
+
+    async def expire(self, prefix, owner, name, cooldown):
+        """Changes the remaining time of an existing cooldown, returns 0 if unset"""
+        return await self._run(
+            EXPIRE_SCRIPT,
+            (f"{prefix}:{owner}:{name}", f"{prefix}index:{owner}"),
+            (name, cooldown, int(time())),
+        )
+
+    async def reset(self, prefix, owner, name):
+        """Removes a cooldown, returns 0 if it wasn't set"""
+        async with self.redis.get() as redis:
+            deleted, removed = await asyncio.gather(
+                redis.execute("DEL", f"{prefix}:{owner}:{name}"),
+                redis.execute("ZREM", f"{prefix}index:{owner}", name),
+            )
+        return deleted
+
+    async def list(self, prefix, owner):
+        """Returns (command, remaining seconds) for all cooldowns of an owner"""
+        now = int(time())
+        raw = await self.redis.execute(
+            "ZRANGEBYSCORE", f"{prefix}index:{owner}", f"({now}", "+inf", "WITHSCORES"
+        )
+        it = iter(raw)
+        return [
+            (name.decode(), int(float(expiry)) - now) for name, expiry in zip(it, it)
+        ]
@@ -0,0 +1,376 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+import re
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import aioredis
+import asyncpg
+
+# Upper bounds of the histogram buckets in milliseconds, 25% apart
+BUCKETS = tuple(round(1.25 ** i, 2) for i in range(50))
+
+
+class CommandProfile:
+    """Counts the database and HTTP calls made while a command runs."""
+
+    __slots__ = ("pg_calls", "pg_time", "redis_calls", "redis_time", "http_calls")
+
+    def __init__(self) -> None:
+        self.pg_calls = 0
+        self.pg_time = 0.0
+        self.redis_calls = 0
+        self.redis_time = 0.0
+        self.http_calls = 0
+
+
+# The profile of the command running in the current task, if any
+current_profile: ContextVar[Optional[CommandProfile]] = ContextVar(
+    "current_profile", default=None
+)
+
+
+class Histogram:
+    """A fixed size histogram of durations in milliseconds."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.buckets[bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percent: float) -> float:
+        """Returns the upper bound of the bucket the percentile falls into"""
+        target = self.count * percent / 100
+        seen = 0
+        for idx, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= target and amount:
+                return BUCKETS[idx] if idx < len(BUCKETS) else float("inf")
+        return 0.0
+
+
+class CommandStats:
+    """The collected timings and call counts of a single command."""
+
+    def __init__(self) -> None:
+        self.wall = Histogram()
+        self.pg_calls = 0
+        self.pg_time = 0.0
+        self.redis_calls = 0
+        self.redis_time = 0.0
+        self.http_calls = 0
+
+    def add(self, wall: float, profile: CommandProfile) -> None:
+        self.wall.add(wall)
+        self.pg_calls += profile.pg_calls
+        self.pg_time += profile.pg_time
+        self.redis_calls += profile.redis_calls
+        self.redis_time += profile.redis_time
+        self.http_calls += profile.http_calls
+
+    def summary(self) -> Dict[str, Any]:
+        count = self.wall.count
+        return {
+            "count": count,
+            "total": round(self.wall.total),
+            "p50": self.wall.percentile(50),
+            "p95": self.wall.percentile(95),
+            "p99": self.wall.percentile(99),
+            "pg_calls": round(self.pg_calls / count, 2),
+            "pg_time": round(self.pg_time / count, 2),
+            "redis_calls": round(self.redis_calls / count, 2),
+            "redis_time": round(self.redis_time / count, 2),
+            "http_calls": round(self.http_calls / count, 2),
+        }
+
+
+class Profiler:
+    """Keeps the stats of every command run on this cluster."""
+
+    def __init__(self) -> None:
+        self.commands: Dict[str, CommandStats] = {}
+
+    def record(self, command: str, wall: float, profile: CommandProfile) -> None:
+        try:
+            stats = self.commands[command]
+        except KeyError:
+            stats = self.commands[command] = CommandStats()
+        stats.add(wall, profile)
+
+    def top(self, count: int = 10) -> List[Dict[str, Any]]:
+        """Returns the summaries of the commands with the most total time"""
+        stats = sorted(
+            self.commands.items(), key=lambda i: i[1].wall.total, reverse=True
+        )
+        return [{"command": name, **i.summary()} for name, i in stats[:count]]
+
+    def reset(self) -> None:
+        self.commands = {}
+
+
+def normalize_query(query: str) -> str:
+    """Collapses whitespace and replaces literals so equal queries look alike"""
+    query = re.sub(r"'(?:[^']|'')*'", "?", query)
+    query = re.sub(r"(?<![$\w])\d+(?:\.\d+)?\b", "?", query)
+    return " ".join(query.split())
+
+
+def argument_shapes(args: Tuple[Any, ...]) -> str:
+    """Returns the types of query arguments, with the length of lists"""
+    shapes = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            shapes.append(f"{type(arg).__name__}[{len(arg)}]")
+        else:
+            shapes.append(type(arg).__name__)
+    return ", ".join(shapes)
+
+
+# Statements that EXPLAIN accepts
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+# Statements that are safe to run again for EXPLAIN ANALYZE, the others
+# only get their estimated plan so writes are never repeated
+ANALYZABLE = ("SELECT",)
+
+
+class SlowQuery:
+    """All recorded runs of one normalized query."""
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.shapes: Dict[str, int] = {}
+        self.plans: List[str] = []
+        self.explaining = 0
+
+
+class SlowQueryLog:
+    """
+    Collects Postgres queries slower than a threshold.
+    The first few runs of each query get their plan captured in the
+    background on a connection of pool, and only the queries with the most
+    total time are kept.
+    """
+
+    def __init__(self, threshold: float = 100, explain_count: int = 3) -> None:
+        self.threshold = threshold
+        self.explain_count = explain_count
+        self.capacity = 250
+        self.queries: Dict[str, SlowQuery] = {}
+        self.pool: Optional[asyncpg.Pool] = None
+        self.tasks: Set["asyncio.Task[None]"] = set()
+
+    def record(self, query: str, args: Tuple[Any, ...], took: float) -> SlowQuery:
+        key = normalize_query(query)
+        try:
+            entry = self.queries[key]
+        except KeyError:
+            if len(self.queries) >= self.capacity:
+                least = min(self.queries.values(), key=lambda i: i.total)
+                del self.queries[least.query]
+            entry = self.queries[key] = SlowQuery(key)
+        entry.count += 1
+        entry.total += took
+        entry.max = max(entry.max, took)
+        shape = argument_shapes(args)
+        entry.shapes[shape] = entry.shapes.get(shape, 0) + 1
+        return entry
+
+    def wants_plan(self, entry: SlowQuery, query: str) -> bool:
+        if self.pool is None:
+            return False
+        if len(entry.plans) + entry.explaining >= self.explain_count:
+            return False
+        return query.split(None, 1)[0].upper() in EXPLAINABLE
+
+    def explain_later(
+        self, entry: SlowQuery, query: str, args: Tuple[Any, ...]
+    ) -> None:
+        """Captures the plan of a query without holding up its caller"""
+        entry.explaining += 1
+        task = asyncio.get_running_loop().create_task(self._explain(entry, query, args))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _explain(
+        self, entry: SlowQuery, query: str, args: Tuple[Any, ...]
+    ) -> None:
+        """Runs EXPLAIN in a transaction that is always rolled back"""
+        if query.split(None, 1)[0].upper() in ANALYZABLE:
+            explain = "EXPLAIN (ANALYZE, BUFFERS)"
+        else:
+            explain = "EXPLAIN"
+        try:
+            assert self.pool is not None
+            async with self.pool.acquire() as conn:
+                tr = conn.transaction()
+                await tr.start()
+                try:
+                    # not counted for the command nor recorded as slow query
+                    rows = await conn.fetch(f"{explain} {query}", *args, profile=False)
+                finally:
+                    await tr.rollback()
+            plan = "\n".join(row[0] for row in rows)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {type(e).__name__}: {e}"
+        finally:
+            entry.explaining -= 1
+        entry.plans.append(plan)
+
+    def top(self, count: int = 10) -> List[SlowQuery]:
+        """Returns the slow queries with the most total time"""
+        return sorted(self.queries.values(), key=lambda i: i.total, reverse=True)[
+            :count
+        ]
+
+    def reset(self) -> None:
+        self.queries = {}
+
+
+slow_queries = SlowQueryLog()
+
+
+def track_pg(start: float) -> float:
+    took = (perf_counter() - start) * 1000
+    if (profile := current_profile.get()) is not None:
+        profile.pg_calls += 1
+        profile.pg_time += took
+    return took
+
+
+class ProfiledConnection(asyncpg.Connection):
+    """
+    An asyncpg connection which counts queries made by commands
+    and records slow queries in the slow query log.
+    Queries run with profile=False are neither counted nor recorded.
+    """
+
+    __slots__ = ("statements",)
+
+    # The statements prepared by classes.queries, set by the pool's init hook
+    statements: Dict[str, Any]
+
+    async def _run(
+        self,
+        call: Awaitable[Any],
+        query: str,
+        args: Tuple[Any, ...],
+        profile: bool = True,
+        explain: bool = True,
+    ) -> Any:
+        if not profile:
+            return await call
+        start = perf_counter()
+        try:
+            result = await call
+        except BaseException:
+            track_pg(start)
+            raise
+        took = track_pg(start)
+        if took >= slow_queries.threshold:
+            entry = slow_queries.record(query, args, took)
+            if explain and slow_queries.wants_plan(entry, query):
+                slow_queries.explain_later(entry, query, args)
+        return result
+
+    async def run_statement(self, name: str, method: str, *args: Any) -> Any:
+        """Runs a prepared statement by name, see classes.queries"""
+        statement = self.statements[name]
+        return await self._run(
+            getattr(statement, method)(*args), statement.get_query(), args
+        )
+
+    async def execute(
+        self, query: str, *args: Any, profile: bool = True, **kwargs: Any
+    ) -> Any:
+        return await self._run(
+            super().execute(query, *args, **kwargs), query, args, profile
+        )
+
+    async def executemany(
+        self, query: str, args: Any, profile: bool = True, **kwargs: Any
+    ) -> Any:
+        # the plan of one row says little about the batch, so don't EXPLAIN it
+        return await self._run(
+            super().executemany(query, args, **kwargs),
+            query,
+            (args,),
+            profile,
+            explain=False,
+        )
+
+    async def fetch(
+        self, query: str, *args: Any, profile: bool = True, **kwargs: Any
+    ) -> Any:
+        return await self._run(
+            super().fetch(query, *args, **kwargs), query, args, profile
+        )
+
+    async def fetchval(
+        self, query: str, *args: Any, profile: bool = True, **kwargs: Any
+    ) -> Any:
+        return await self._run(
+            super().fetchval(query, *args, **kwargs), query, args, profile
+        )
+
+    async def fetchrow(
+        self, query: str, *args: Any, profile: bool = True, **kwargs: Any
+    ) -> Any:
+        return await self._run(
+            super().fetchrow(query, *args, **kwargs), query, args, profile
+        )
+
+
+def redis_timer(profile: CommandProfile, start: float) -> Callable[[Any], None]:
+    def done(fut: Any) -> None:
+        profile.redis_time += (perf_counter() - start) * 1000
+
+    return done
+
+
+class ProfiledRedisConnection(aioredis.RedisConnection):
+    """An aioredis connection which counts commands sent by commands."""
+
+    def execute(self, *args: Any, **kwargs: Any) -> Any:
+        fut = super().execute(*args, **kwargs)
+        if (profile := current_profile.get()) is not None:
+            profile.redis_calls += 1
+            fut.add_done_callback(redis_timer(profile, perf_counter()))
+        return fut
+
+
+def count_http(request: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    """Wraps discord.py's HTTPClient.request to count requests made by commands"""
+
+    async def wrapped(*args: Any, **kwargs: Any) -> Any:
+        if (profile := current_profile.get()) is not None:
+            profile.http_calls += 1
+        return await request(*args, **kwargs)
+
+    return wrapped
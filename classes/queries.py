@@ -0,0 +1,73 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from typing import Any, Dict, Union
+
+import asyncpg
+
+from classes.profiling import ProfiledConnection
+
+# Statements that run so often that they are prepared once per connection.
+# Call them by name with fetch/fetchrow/fetchval/execute below.
+QUERIES = {
+    "get_profile": 'SELECT * FROM profile WHERE "user"=$1;',
+    "get_profiles": 'SELECT * FROM profile WHERE "user"=ANY($1);',
+    "get_equipped_items": (
+        "SELECT ai.* FROM profile p JOIN allitems ai ON (p.user=ai.owner) JOIN"
+        " inventory i ON (ai.id=i.item) WHERE i.equipped IS TRUE AND p.user=$1;"
+    ),
+    "add_money": 'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
+    "remove_money": 'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
+    "log_transaction": (
+        'INSERT INTO transactions ("from", "to", "subject", "info", "timestamp")'
+        " VALUES ($1, $2, $3, $4, $5);"
+    ),
+}
+
+Connection = Union[ProfiledConnection, asyncpg.Pool]
+
+
+async def prepare_statements(conn: ProfiledConnection) -> None:
+    """Pool init hook, prepares all registered statements on a new connection"""
+    statements: Dict[str, Any] = {}
+    for name, query in QUERIES.items():
+        statements[name] = await conn.prepare(query)
+    conn.statements = statements
+
+
+async def _run(conn: Connection, name: str, method: str, *args: Any) -> Any:
+    if isinstance(conn, asyncpg.Pool):
+        async with conn.acquire() as acquired:
+            return await _run(acquired, name, method, *args)
+    return await conn.run_statement(name, method, *args)
+
+
+async def fetch(conn: Connection, name: str, *args: Any) -> Any:
+    return await _run(conn, name, "fetch", *args)
+
+
+async def fetchrow(conn: Connection, name: str, *args: Any) -> Any:
+    return await _run(conn, name, "fetchrow", *args)
+
+
+async def fetchval(conn: Connection, name: str, *args: Any) -> Any:
+    return await _run(conn, name, "fetchval", *args)
+
+
+async def execute(conn: Connection, name: str, *args: Any) -> None:
+    """Runs a statement that returns no rows"""
+    await _run(conn, name, "fetch", *args)
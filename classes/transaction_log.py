@@ -0,0 +1,191 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+import asyncpg
+
+from classes import queries
+
+COLUMNS = {
+    "transactions": ("from", "to", "subject", "info", "timestamp"),
+    "market_history": (
+        "item",
+        "name",
+        "value",
+        "type",
+        "damage",
+        "armor",
+        "signature",
+        "price",
+        "offer",
+    ),
+}
+
+MARKET_HISTORY_QUERY = (
+    'INSERT INTO market_history ("item", "name", "value", "type", "damage",'
+    ' "armor", "signature", "price", "offer") VALUES ($1, $2, $3, $4, $5, $6,'
+    " $7, $8, $9);"
+)
+
+# Errors for which retrying a record can never succeed
+BAD_RECORD_ERRORS = (asyncpg.DataError, asyncpg.IntegrityConstraintViolationError)
+
+
+class TransactionLogWriter:
+    """
+    Buffers transaction log records and writes them in the background.
+
+    Records are copied into their table every batch_size records or
+    every interval seconds, whichever comes first. If a COPY fails, its
+    records are inserted one by one and the ones Postgres rejects are
+    dropped. Records that could not be written at all are retried with the
+    next batch, at most max_pending per table are kept. In sync mode every
+    record is inserted right away instead, e.g. for tests.
+    """
+
+    def __init__(
+        self, bot, batch_size=500, interval=1.0, max_pending=100_000, sync=False
+    ):
+        self.bot = bot
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.sync = sync
+        self.buffers = {table: [] for table in COLUMNS}
+        self.pending = 0
+        self.full = asyncio.Event()
+        self.closed = False
+        self.task = None if sync else bot.loop.create_task(self.writer())
+
+    async def add(self, table, record, conn=None):
+        """Logs a record, conn is only used in sync mode"""
+        if self.sync:
+            return await self._insert(table, record, conn or self.bot.pool)
+        self.buffers[table].append(record)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.full.set()
+
+    async def _insert(self, table, record, conn):
+        if table == "transactions":
+            await queries.execute(conn, "log_transaction", *record)
+        else:
+            await conn.execute(MARKET_HISTORY_QUERY, *record)
+
+    async def writer(self):
+        while not self.closed:
+            try:
+                await asyncio.wait_for(self.full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            try:
+                written = await self.flush()
+            except Exception as e:
+                self.bot.logger.error(f"Failed to flush the transaction log: {e}")
+                written = False
+            if not written and not self.closed:
+                # don't retry a failing write for every new record
+                await asyncio.sleep(self.interval)
+
+    async def _insert_each(self, table, records, conn):
+        """
+        Inserts records one by one after their COPY failed, so a bad record
+        doesn't hold up the others. Records Postgres rejects are dropped.
+        Returns the records that are left to retry later.
+        """
+        for idx, record in enumerate(records):
+            try:
+                await self._insert(table, record, conn)
+            except BAD_RECORD_ERRORS as e:
+                self.bot.logger.error(
+                    f"Dropping transaction log record {record!r} for {table}: {e}"
+                )
+            except Exception as e:
+                self.bot.logger.error(
+                    f"Failed to write {len(records) - idx} records to {table},"
+                    f" retrying later: {e}"
+                )
+                return records[idx:]
+        return []
+
+    def _requeue(self, table, records):
+        """Puts records that failed to be written in front of the buffer"""
+        buffer = records + self.buffers[table]
+        if (dropped := len(buffer) - self.max_pending) > 0:
+            self.bot.logger.critical(
+                f"Transaction log buffer for {table} is full, dropping the"
+                f" {dropped} oldest records"
+            )
+            buffer = buffer[dropped:]
+        self.pending += len(buffer) - len(self.buffers[table])
+        self.buffers[table] = buffer
+
+    async def flush(self):
+        """
+        Writes all buffered records to Postgres
+        Returns whether everything was written, failed records are requeued
+        """
+        self.full.clear()
+        if not self.pending:
+            return True
+        buffers = self.buffers
+        self.buffers = {table: [] for table in COLUMNS}
+        self.pending = 0
+        written = set()
+        try:
+            async with self.bot.pool.acquire() as conn:
+                for table, records in buffers.items():
+                    if not records:
+                        written.add(table)
+                        continue
+                    try:
+                        await conn.copy_records_to_table(
+                            table, records=records, columns=COLUMNS[table]
+                        )
+                    except Exception as e:
+                        self.bot.logger.error(
+                            f"Failed to copy {len(records)} records to {table},"
+                            f" inserting them one by one: {e}"
+                        )
+                        buffers[table] = await self._insert_each(table, records, conn)
+                        if not buffers[table]:
+                            written.add(table)
+                    else:
+                        written.add(table)
+        finally:
+            for table, records in buffers.items():
+                if table not in written:
+                    self._requeue(table, records)
+        return len(written) == len(buffers)
+
+    async def close(self):
+        """Stops the background writer and writes what is left"""
+        self.closed = True
+        self.full.set()
+        if self.task is not None:
+            await self.task
+            self.task = None
+        try:
+            written = await self.flush()
+        except Exception as e:
+            self.bot.logger.error(f"Failed to flush the transaction log: {e}")
+            written = False
+        if not written:
+            self.bot.logger.critical(
+                f"Lost {self.pending} transaction log records on shutdown"
+            )
@@ -24,10 +24,11 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import IntFromTo
 from classes.enums import DonatorRank
 from cogs.shard_communication import user_on_cooldown as user_cooldown
-from utils import items
+from utils import items, levels
 from utils import misc as rpgtools
 from utils import random
 from utils.checks import has_adventure, has_char, has_no_adventure
@@ -50,7 +51,7 @@ class Adventure(commands.Cog):
             Your chances are determined by your equipped items, race and class bonuses, your level and your God-given luck."""
         )
         damage, defense = await self.bot.get_damage_armor_for(ctx.author)
-        level = rpgtools.xptolevel(ctx.character_data["xp"])
+        level = levels.xptolevel(ctx.character_data["xp"])
         luck_booster = await self.bot.get_booster(ctx.author, "luck")
 
         chances = []
@@ -108,7 +109,7 @@ class Adventure(commands.Cog):
 
             Be sure to check `{prefix}status` to check how much time is left, or to check if you survived or died."""
         )
-        if adventure_number > rpgtools.xptolevel(ctx.character_data["xp"]):
+        if adventure_number > levels.xptolevel(ctx.character_data["xp"]):
             return await ctx.send(
                 _("You must be on level **{level}** to do this adventure.").format(
                     level=adventure_number
@@ -286,11 +287,7 @@ class Adventure(commands.Cog):
                 val = attack + defense
                 money = random.randint(val, val * 25)
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        money,
-                        ctx.author.id,
-                    )
+                    await queries.execute(conn, "add_money", money, ctx.author.id)
                     await self.bot.cache.update_profile_cols_rel(
                         ctx.author.id, money=money
                     )
@@ -416,11 +413,7 @@ class Adventure(commands.Cog):
         val = attack + defense
         money = random.randint(val * 5, val * 100)
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                money,
-                ctx.author.id,
-            )
+            await queries.execute(conn, "add_money", money, ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
             await self.bot.log_transaction(
                 ctx,
@@ -480,7 +473,7 @@ class Adventure(commands.Cog):
         damage, armor = await self.bot.get_damage_armor_for(ctx.author)
 
         luck_booster = await self.bot.get_booster(ctx.author, "luck")
-        current_level = int(rpgtools.xptolevel(ctx.character_data["xp"]))
+        current_level = int(levels.xptolevel(ctx.character_data["xp"]))
         luck_multiply = ctx.character_data["luck"]
         if (
             buildings := await self.bot.get_city_buildings(ctx.character_data["guild"])
@@ -615,7 +608,7 @@ class Adventure(commands.Cog):
                 )
             )
 
-            new_level = int(rpgtools.xptolevel(ctx.character_data["xp"] + xp))
+            new_level = int(levels.xptolevel(ctx.character_data["xp"] + xp))
 
             if current_level != new_level:
                 await self.bot.process_levelup(ctx, new_level, current_level)
@@ -109,12 +109,13 @@ class Alliance(commands.Cog):
         alliance_embed = discord.Embed(
             title=_("Your allied guilds"), color=self.bot.config.primary_colour
         ).set_thumbnail(url="https://idlerpg.xyz/alliance_banner.png")
-        for guild in allied_guilds:
+        leaders = await rpgtools.lookup_many(
+            self.bot, [g["leader"] for g in allied_guilds]
+        )
+        for guild, leader in zip(allied_guilds, leaders):
             alliance_embed.add_field(
                 name=guild[1],
-                value=_("Led by {leader}").format(
-                    leader=await rpgtools.lookup(self.bot, guild["leader"])
-                ),
+                value=_("Led by {leader}").format(leader=leader),
                 inline=False,
             )
         alliance_embed.set_footer(
@@ -736,24 +737,23 @@ class Alliance(commands.Cog):
         a_users = await self.bot.get_joins(id_)
 
         async with self.bot.pool.acquire() as conn:
-            for u in a_users:
-                profile = await self.bot.cache.get_profile(u.id, conn=conn)
-                if not profile:
-                    continue  # not a player
-                user_alliance = await conn.fetchval(
-                    'SELECT alliance FROM guild WHERE "id"=$1;', profile["guild"]
-                )
-                if user_alliance != alliance_id:
-                    continue
-                damage, defense = await self.bot.get_raidstats(
-                    u,
-                    atkmultiply=profile["atkmultiply"],
-                    defmultiply=profile["defmultiply"],
-                    classes=profile["class"],
-                    race=profile["race"],
-                    guild=profile["guild"],
-                    conn=conn,
+            profiles = await self.bot.cache.get_profiles(
+                [u.id for u in a_users], conn=conn
+            )
+            alliance_guilds = {
+                row["id"]
+                for row in await conn.fetch(
+                    'SELECT "id" FROM guild WHERE "alliance"=$1;', alliance_id
                 )
+            }
+            users = [
+                u
+                for u in a_users
+                if (profile := profiles.get(u.id))
+                and profile["guild"] in alliance_guilds
+            ]
+            stats = await self.bot.get_raidstats_bulk(users, conn=conn)
+            for u, (damage, defense) in stats.items():
                 if u not in attacking_users:
                     attacking_users.append(u)
                     attackers.append(
@@ -915,16 +915,13 @@ class Alliance(commands.Cog):
             'SELECT alliance FROM guild WHERE "id"=$1;',
             ctx.character_data["guild"],
         )
-        cooldowns = await self.bot.redis.execute("KEYS", f"alliancecd:{alliance}:*")
+        cooldowns = await self.bot.cooldowns.list("alliancecd", alliance)
         if not cooldowns:
             return await ctx.send(
                 _("Your alliance does not have any active cooldown at the moment.")
             )
         timers = _("Commands on cooldown:")
-        for key in cooldowns:
-            key = key.decode()
-            cooldown = await self.bot.redis.execute("TTL", key)
-            cmd = key.replace(f"alliancecd:{alliance}:", "")
+        for cmd, cooldown in cooldowns:
             text = _("{cmd} is on cooldown and will be available after {time}").format(
                 cmd=cmd, time=timedelta(seconds=int(cooldown))
             )
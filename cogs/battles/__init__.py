@@ -19,15 +19,15 @@ import asyncio
 import datetime
 
 from collections import deque
-from decimal import Decimal
 
 import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import IntGreaterThan, MemberConverter
 from cogs.shard_communication import user_on_cooldown as user_cooldown
-from utils import random
+from utils.battles import active_roll, duel, raid_fight
 from utils.checks import has_char, has_money
 from utils.i18n import _, locale_doc
 
@@ -62,11 +62,7 @@ class Battles(commands.Cog):
         if ctx.character_data["money"] < money:
             return await ctx.send(_("You are too poor."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            money,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-money)
 
         if not enemy:
@@ -105,11 +101,7 @@ class Battles(commands.Cog):
                 )
             except asyncio.TimeoutError:
                 await self.bot.reset_cooldown(ctx)
-                await self.bot.pool.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(self.bot.pool, "add_money", money, ctx.author.id)
                 await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
                 return await ctx.send(
                     _("Noone wanted to join your battle, {author}!").format(
@@ -129,20 +121,16 @@ class Battles(commands.Cog):
             ).format(author=ctx.disp, enemy=enemy_.display_name)
         )
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;', money, enemy_.id
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, enemy_.id)
         await self.bot.cache.update_profile_cols_rel(enemy_.id, money=-money)
 
-        stats = [
-            sum(await self.bot.get_damage_armor_for(ctx.author)) + random.randint(1, 7),
-            sum(await self.bot.get_damage_armor_for(enemy_)) + random.randint(1, 7),
-        ]
         players = [ctx.author, enemy_]
-        if stats[0] == stats[1]:
-            winner = random.choice(players)
-        else:
-            winner = players[stats.index(max(stats))]
+        winner = players[
+            duel(
+                sum(await self.bot.get_damage_armor_for(ctx.author)),
+                sum(await self.bot.get_damage_armor_for(enemy_)),
+            )
+        ]
         looser = players[players.index(winner) - 1]
 
         await asyncio.sleep(30)
@@ -199,11 +187,7 @@ class Battles(commands.Cog):
         if ctx.character_data["money"] < money:
             return await ctx.send(_("You are too poor."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            money,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-money)
 
         if not enemy:
@@ -242,11 +226,7 @@ class Battles(commands.Cog):
                 )
             except asyncio.TimeoutError:
                 await self.bot.reset_cooldown(ctx)
-                await self.bot.pool.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(self.bot.pool, "add_money", money, ctx.author.id)
                 await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
                 return await ctx.send(
                     _("Noone wanted to join your raidbattle, {author}!").format(
@@ -259,9 +239,7 @@ class Battles(commands.Cog):
                 enemy_ = None
                 await ctx.send(_("You don't have enough money to join the raidbattle."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;', money, enemy_.id
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, enemy_.id)
         await self.bot.cache.update_profile_cols_rel(enemy_.id, money=-money)
 
         players = []
@@ -296,23 +274,8 @@ class Battles(commands.Cog):
         await asyncio.sleep(4)
 
         start = datetime.datetime.utcnow()
-        attacker, defender = random.sample(
-            players, k=2
-        )  # decide a random attacker and defender for the first iteration
-
-        while (
-            players[0]["hp"] > 0
-            and players[1]["hp"] > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=5)
-        ):
+        for attacker, defender, dmg in raid_fight(players):
             # this is where the fun begins
-            dmg = (
-                attacker["damage"] + Decimal(random.randint(0, 100)) - defender["armor"]
-            )
-            dmg = 1 if dmg <= 0 else dmg  # make sure no negative damage happens
-            defender["hp"] -= dmg
-            if defender["hp"] < 0:
-                defender["hp"] = 0
             battle_log.append(
                 (
                     battle_log[-1][0] + 1,
@@ -343,7 +306,8 @@ class Battles(commands.Cog):
 
             await log_message.edit(embed=embed)
             await asyncio.sleep(4)
-            attacker, defender = defender, attacker  # switch places
+            if datetime.datetime.utcnow() >= start + datetime.timedelta(minutes=5):
+                break
 
         players = sorted(players, key=lambda x: x["hp"])
         winner = players[1]["user"]
@@ -402,11 +366,7 @@ class Battles(commands.Cog):
         if ctx.character_data["money"] < money:
             return await ctx.send(_("You are too poor."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            money,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-money)
 
         if not enemy:
@@ -446,11 +406,7 @@ class Battles(commands.Cog):
                 )
             except asyncio.TimeoutError:
                 await self.bot.reset_cooldown(ctx)
-                await self.bot.pool.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(self.bot.pool, "add_money", money, ctx.author.id)
                 await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
                 return await ctx.send(
                     _("Noone wanted to join your activebattle, {author}!").format(
@@ -483,11 +439,7 @@ class Battles(commands.Cog):
         }
 
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                money,
-                enemy_.id,
-            )
+            await queries.execute(conn, "remove_money", money, enemy_.id)
             await self.bot.cache.update_profile_cols_rel(enemy_.id, money=-money)
 
             for p in players:
@@ -593,14 +545,7 @@ class Battles(commands.Cog):
                     players[user]["action"] == "attack"
                     and players[other]["action"] != "defend"
                 ):
-                    eff = random.choice(
-                        [
-                            players[user]["damage"],
-                            int(players[user]["damage"] * 0.5),
-                            int(players[user]["damage"] * 0.2),
-                            int(players[user]["damage"] * 0.8),
-                        ]
-                    )
+                    eff = active_roll(players[user]["damage"])
                     players[other]["hp"] -= eff
                     players[user]["lastmove"] = _(
                         "{user} hit {enemy} for **{eff}** damage."
@@ -609,22 +554,8 @@ class Battles(commands.Cog):
                     players[user]["action"] == "attack"
                     and players[other]["action"] == "defend"
                 ):
-                    eff = random.choice(
-                        [
-                            int(players[user]["damage"]),
-                            int(players[user]["damage"] * 0.5),
-                            int(players[user]["damage"] * 0.2),
-                            int(players[user]["damage"] * 0.8),
-                        ]
-                    )
-                    eff2 = random.choice(
-                        [
-                            int(players[other]["defense"]),
-                            int(players[other]["defense"] * 0.5),
-                            int(players[other]["defense"] * 0.2),
-                            int(players[other]["defense"] * 0.8),
-                        ]
-                    )
+                    eff = active_roll(players[user]["damage"])
+                    eff2 = active_roll(players[other]["defense"])
                     if eff - eff2 > 0:
                         players[other]["hp"] -= eff - eff2
                         players[user]["lastmove"] = _(
@@ -22,11 +22,11 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import ImageFormat, ImageUrl
 from cogs.shard_communication import next_day_cooldown
 from cogs.shard_communication import user_on_cooldown as user_cooldown
-from utils import misc as rpgtools
-from utils import random
+from utils import levels, random
 from utils.checks import has_char, has_money, is_class, update_pet, user_is_patron
 from utils.i18n import _, locale_doc
 
@@ -55,7 +55,7 @@ class Classes(commands.Cog):
 
             (This command has a cooldown of 24 hours)"""
         )
-        if rpgtools.xptolevel(ctx.character_data["xp"]) >= 12:
+        if levels.xptolevel(ctx.character_data["xp"]) >= 12:
             val = await self.bot.paginator.Choose(
                 title=_("Select class to change"),
                 entries=[_("Primary Class"), _("Secondary Class")],
@@ -262,7 +262,7 @@ class Classes(commands.Cog):
             - Ritualists gain +5% extra favor when sacrificing per evolution
             (- Paragons gain +1 damage *and* +1 defense per evolution)"""
         )
-        level = rpgtools.xptolevel(ctx.character_data["xp"])
+        level = levels.xptolevel(ctx.character_data["xp"])
         if level < 5:
             return await ctx.send(_("Your level isn't high enough to evolve."))
         newindex = int(level / 5) - 1
@@ -354,16 +354,8 @@ class Classes(commands.Cog):
                     )
 
                 stolen = int(usr["money"] * 0.1)
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    stolen,
-                    ctx.author.id,
-                )
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                    stolen,
-                    usr["user"],
-                )
+                await queries.execute(conn, "add_money", stolen, ctx.author.id)
+                await queries.execute(conn, "remove_money", stolen, usr["user"])
                 await self.bot.cache.update_profile_cols_rel(
                     ctx.author.id, money=stolen
                 )
@@ -449,11 +441,7 @@ class Classes(commands.Cog):
         if not await has_money(self.bot, ctx.author.id, item[1]):
             return await ctx.send(_("You are too poor to buy this."))
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                item[1],
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", item[1], ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-item[1])
             await conn.execute(
                 'UPDATE pets SET "food"=CASE WHEN "food"+$1>=100 THEN 100 ELSE'
@@ -507,11 +495,7 @@ class Classes(commands.Cog):
         if not await has_money(self.bot, ctx.author.id, item[1]):
             return await ctx.send(_("You are too poor to buy this."))
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                item[1],
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", item[1], ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-item[1])
             await conn.execute(
                 'UPDATE pets SET "drink"=CASE WHEN "drink"+$1>=100 THEN 100 ELSE'
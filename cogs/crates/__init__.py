@@ -161,9 +161,11 @@ class Crates(commands.Cog):
                     minvalue=1,
                     maxvalue=250,
                     owner=ctx.author,
-                    conn=conn,
+                    insert=False,
                 )
                 items.append(item)
+            items = await self.bot.create_items_bulk(items, conn=conn)
+            for item in items:
                 await self.bot.log_transaction(
                     ctx,
                     from_=1,
@@ -25,6 +25,7 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import CoinSide, IntFromTo, IntGreaterThan, MemberWithCharacter
 from utils import random
 from utils.checks import has_char, has_money, user_has_char
@@ -167,10 +168,8 @@ class BlackJack:
     async def player_win(self):
         if self.money > 0:
             async with self.ctx.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    self.money * 2,
-                    self.ctx.author.id,
+                await queries.execute(
+                    conn, "add_money", self.money * 2, self.ctx.author.id
                 )
                 await self.ctx.bot.log_transaction(
                     self.ctx,
@@ -188,11 +187,7 @@ class BlackJack:
         if self.money > 0:
             total = int(self.money * 2.5)
             async with self.ctx.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    total,
-                    self.ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", total, self.ctx.author.id)
                 await self.ctx.bot.log_transaction(
                     self.ctx,
                     from_=1,
@@ -208,11 +203,7 @@ class BlackJack:
     async def player_cashback(self):
         if self.money > 0:
             async with self.ctx.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    self.money,
-                    self.ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", self.money, self.ctx.author.id)
                 await self.ctx.bot.log_transaction(
                     self.ctx,
                     from_=1,
@@ -356,10 +347,8 @@ class BlackJack:
                 self.doubled = True
                 if self.money > 0:
                     async with self.ctx.bot.pool.acquire() as conn:
-                        await conn.execute(
-                            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                            self.money,
-                            self.ctx.author.id,
+                        await queries.execute(
+                            conn, "remove_money", self.money, self.ctx.author.id
                         )
                         await self.ctx.bot.log_transaction(
                             self.ctx,
@@ -476,19 +465,11 @@ class Gambling(commands.Cog):
             if ctx.character_data["money"] < money:
                 return await ctx.send(_("You are too poor."))
 
-            await self.bot.pool.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                money,
-                ctx.author.id,
-            )
+            await queries.execute(self.bot.pool, "remove_money", money, ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-money)
 
             async def money_back():
-                await self.bot.pool.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(self.bot.pool, "add_money", money, ctx.author.id)
                 await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
                 return await self.bot.reset_cooldown(ctx)
 
@@ -529,11 +510,7 @@ class Gambling(commands.Cog):
                     )
                 )
 
-            await self.bot.pool.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                money,
-                enemy.id,
-            )
+            await queries.execute(self.bot.pool, "remove_money", money, enemy.id)
             await self.bot.cache.update_profile_cols_rel(enemy.id, money=-money)
 
             cards = self.cards.copy()
@@ -588,11 +565,7 @@ class Gambling(commands.Cog):
                         players = [ctx.author, enemy]
                         winner = players[drawn_values.index(max(drawn_values))]
                         loser = players[players.index(winner) - 1]
-                        await conn.execute(
-                            'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                            money * 2,
-                            winner.id,
-                        )
+                        await queries.execute(conn, "add_money", money * 2, winner.id)
                         await self.bot.cache.update_profile_cols_rel(
                             winner.id, money=money * 2
                         )
@@ -804,11 +777,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
         if result[0] == side:
             if amount > 0:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        amount,
-                        ctx.author.id,
-                    )
+                    await queries.execute(conn, "add_money", amount, ctx.author.id)
                     await self.bot.log_transaction(
                         ctx,
                         from_=1,
@@ -828,11 +797,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
         else:
             if amount > 0:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                        amount,
-                        ctx.author.id,
-                    )
+                    await queries.execute(conn, "remove_money", amount, ctx.author.id)
                     await self.bot.log_transaction(
                         ctx,
                         from_=ctx.author.id,
@@ -891,10 +856,8 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
         if randomn == tip:
             if money > 0:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        money * (maximum - 1),
-                        ctx.author.id,
+                    await queries.execute(
+                        conn, "add_money", money * (maximum - 1), ctx.author.id
                     )
                     await self.bot.log_transaction(
                         ctx,
@@ -921,11 +884,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
         else:
             if money > 0:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                        money,
-                        ctx.author.id,
-                    )
+                    await queries.execute(conn, "remove_money", money, ctx.author.id)
                     await self.bot.log_transaction(
                         ctx,
                         from_=ctx.author.id,
@@ -969,11 +928,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
         )
         if ctx.character_data["money"] < amount:
             return await ctx.send(_("You're too poor."))
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            amount,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", amount, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-amount)
         if amount > 0:
             await self.bot.log_transaction(
@@ -1053,11 +1008,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
                 ).paginate(ctx, user=user)
             except self.bot.paginator.NoChoice:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        money,
-                        other.id,
-                    )
+                    await queries.execute(conn, "add_money", money, other.id)
                     await self.bot.log_transaction(
                         ctx,
                         from_=1,
@@ -1071,11 +1022,7 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
 
             if action:
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        money,
-                        user.id,
-                    )
+                    await queries.execute(conn, "add_money", money, user.id)
                     await self.bot.log_transaction(
                         ctx,
                         from_=other.id,
@@ -1091,21 +1038,13 @@ This command is in an alpha-stage, which means bugs are likely to happen. Play a
             else:
                 new_money = money * 2
                 async with self.bot.pool.acquire() as conn:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        money,
-                        other.id,
-                    )
+                    await queries.execute(conn, "add_money", money, other.id)
                     await self.bot.cache.update_profile_cols_rel(other.id, money=money)
                     if not await self.bot.has_money(user.id, new_money, conn=conn):
                         return await ctx.send(
                             _("{user} is too poor to double.").format(user=user)
                         )
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                        new_money,
-                        user.id,
-                    )
+                    await queries.execute(conn, "remove_money", new_money, user.id)
                 await self.bot.cache.update_profile_cols_rel(user.id, money=-new_money)
                 await ctx.send(
                     _("{user} doubled to **${money}**.").format(
@@ -24,6 +24,7 @@ import discord
 from async_timeout import timeout
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import (
     CrateRarity,
     IntFromTo,
@@ -122,9 +123,7 @@ class GameMaster(commands.Cog):
 
             Only Game Masters can use this command."""
         )
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;', money, other.id
-        )
+        await queries.execute(self.bot.pool, "add_money", money, other.id)
         await self.bot.cache.update_profile_cols_rel(other.id, money=money)
         await ctx.send(
             _(
@@ -148,9 +147,7 @@ class GameMaster(commands.Cog):
 
             Only Game Masters can use this command."""
         )
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;', money, other.id
-        )
+        await queries.execute(self.bot.pool, "remove_money", money, other.id)
         await self.bot.cache.update_profile_cols_rel(other.id, money=-money)
         await ctx.send(
             _("Successfully removed **${money}** from **{other}**.").format(
@@ -530,10 +527,8 @@ class GameMaster(commands.Cog):
         if ctx.character_data["money"] < amount:
             return await ctx.send(_("You are too poor."))
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                self.top_auction[1],
-                self.top_auction[0].id,
+            await queries.execute(
+                conn, "add_money", self.top_auction[1], self.top_auction[0].id
             )
             await self.bot.cache.update_profile_cols_rel(
                 self.top_auction[0].id, money=self.top_auction[1]
@@ -548,11 +543,7 @@ class GameMaster(commands.Cog):
             )
             self.top_auction = (ctx.author, amount)
             self.auction_cm.shift_by(60 * 30)
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                amount,
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", amount, ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-amount)
             await self.bot.log_transaction(
                 ctx,
@@ -599,11 +590,9 @@ class GameMaster(commands.Cog):
             user_id = user
 
         if cooldown == 0:
-            result = await self.bot.redis.execute("DEL", f"cd:{user_id}:{command}")
+            result = await self.bot.cooldowns.reset("cd", user_id, command)
         else:
-            result = await self.bot.redis.execute(
-                "EXPIRE", f"cd:{user_id}:{command}", cooldown
-            )
+            result = await self.bot.cooldowns.expire("cd", user_id, command, cooldown)
 
         if result == 1:
             await ctx.send(_("The cooldown has been updated!"))
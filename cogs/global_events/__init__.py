@@ -171,19 +171,20 @@ class GlobalEvents(commands.Cog):
         ) or self.bot.config.is_beta:
             return
         while not self.bot.is_closed():
+            guild_count = await self.bot.cogs["Sharding"].get_guild_count()
             await self.bot.session.post(
                 f"https://top.gg/api/bots/{self.bot.user.id}/stats",
-                data=await self.get_topgg_payload(),
+                data=await self.get_topgg_payload(guild_count),
                 headers=self.topgg_auth_headers,
             )
             await self.bot.session.post(
                 f"https://botsfordiscord.com/api/bot/{self.bot.user.id}",
-                data=await self.get_bfd_payload(),
+                data=await self.get_bfd_payload(guild_count),
                 headers=self.bfd_auth_headers,
             )
             await self.bot.session.post(
                 f"https://discordbotlist.com/api/v1/bots/{self.bot.user.id}/stats",
-                data=await self.get_dbl_payload(),
+                data=await self.get_dbl_payload(guild_count),
                 headers=self.dbl_auth_headers,
             )
             await asyncio.sleep(60 * 10)  # update once every 10 minutes
@@ -196,39 +197,22 @@ class GlobalEvents(commands.Cog):
             return  # we're using the default prefix in beta
         ids = [g.id for g in self.bot.guilds]
         self.bot.logger.info(f"Fetching prefixes for {len(ids)} guilds")
-        prefixes = await self.bot.pool.fetch('SELECT "id", "prefix" FROM server;')
+        prefixes = await self.bot.pool.fetch(
+            'SELECT "id", "prefix" FROM server WHERE "id"=ANY($1);', ids
+        )
         for row in prefixes:
-            if row["id"] in ids:
-                self.bot.all_prefixes[row["id"]] = row["prefix"]
+            self.bot.all_prefixes[row["id"]] = row["prefix"]
+        self.bot.build_prefixes()
         self.bot.command_prefix = self.bot._get_prefix
 
-    async def get_topgg_payload(self):
-        return {
-            "server_count": sum(
-                await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
-                )
-            ),
-            "shard_count": self.bot.shard_count,
-        }
+    async def get_topgg_payload(self, guild_count):
+        return {"server_count": guild_count, "shard_count": self.bot.shard_count}
 
-    async def get_bfd_payload(self):
-        return {
-            "server_count": sum(
-                await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
-                )
-            )
-        }
+    async def get_bfd_payload(self, guild_count):
+        return {"server_count": guild_count}
 
-    async def get_dbl_payload(self):
-        return {
-            "guilds": sum(
-                await self.bot.cogs["Sharding"].handler(
-                    "guild_count", self.bot.shard_count
-                )
-            )
-        }
+    async def get_dbl_payload(self, guild_count):
+        return {"guilds": guild_count}
 
     async def send_reminder(
         self,
@@ -256,6 +240,9 @@ class GlobalEvents(commands.Cog):
         now = datetime.datetime.utcnow()
         invalid_reminders = []
         new_reminders = {}
+        await self.bot.get_cog("Locale").preload(
+            [reminder["user"] for reminder in all_reminders]
+        )
         for reminder in all_reminders:
             try:
                 if reminder["end"] < now:
@@ -25,6 +25,7 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import (
     ImageFormat,
     ImageUrl,
@@ -35,8 +36,10 @@ from classes.converters import (
 )
 from cogs.shard_communication import guild_on_cooldown as guild_cooldown
 from cogs.shard_communication import user_on_cooldown as user_cooldown
+from utils import levels
 from utils import misc as rpgtools
 from utils import random
+from utils.battles import duel
 from utils.checks import (
     has_char,
     has_guild,
@@ -148,9 +151,9 @@ class Guild(commands.Cog):
         guilds = await self.bot.pool.fetch(
             "SELECT * FROM guild ORDER BY wins DESC LIMIT 10;"
         )
+        leaders = await rpgtools.lookup_many(self.bot, [g["leader"] for g in guilds])
         result = ""
-        for idx, guild in enumerate(guilds):
-            leader = await rpgtools.lookup(self.bot, guild["leader"])
+        for idx, (guild, leader) in enumerate(zip(guilds, leaders)):
             text = _("a guild by {leader} with **{wins}** GvG Wins").format(
                 leader=escape_markdown(leader), wins=guild["wins"]
             )
@@ -176,13 +179,21 @@ class Guild(commands.Cog):
             'SELECT "user", "guildrank" FROM profile WHERE "guild"=$1;',
             ctx.character_data["guild"],
         )
+        names = await rpgtools.lookup_many(
+            self.bot, [m["user"] for m in members], return_none=True
+        )
+        adventures = await self.bot.get_adventures([m["user"] for m in members])
         members_fmt = []
-        for m in members:
-            u = str(
-                await self.bot.get_user_global(m["user"])
-                or _("Unknown User (ID {id})").format(id=m["user"])
-            )
-            members_fmt.append(f"{escape_markdown(u)} ({m['guildrank']})")
+        for m, name in zip(members, names):
+            u = name or _("Unknown User (ID {id})").format(id=m["user"])
+            text = f"{escape_markdown(u)} ({m['guildrank']})"
+            if adv := adventures.get(m["user"]):
+                if adv[2]:
+                    status = _("adventure {num} finished").format(num=adv[0])
+                else:
+                    status = _("on adventure {num}").format(num=adv[0])
+                text = f"{text} - {status}"
+            members_fmt.append(text)
         await self.bot.paginator.Paginator(
             entries=members_fmt, title=_("Your guild mates")
         ).paginate(ctx)
@@ -819,9 +830,9 @@ class Guild(commands.Cog):
                 ' "money" DESC LIMIT 10;',
                 guild["id"],
             )
+        charnames = await rpgtools.lookup_many(self.bot, [p["user"] for p in players])
         result = ""
-        for idx, profile in enumerate(players):
-            charname = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (profile, charname) in enumerate(zip(players, charnames)):
             text = _("a character by {charname} with **${money}**").format(
                 charname=escape_markdown(charname), money=profile["money"]
             )
@@ -855,15 +866,18 @@ class Guild(commands.Cog):
                 ' "xp" DESC LIMIT 10;',
                 guild["id"],
             )
+        charnames = await rpgtools.lookup_many(self.bot, [p["user"] for p in players])
+        player_levels = levels.xptolevels([p["xp"] for p in players])
         result = ""
-        for idx, profile in enumerate(players):
-            charname = await rpgtools.lookup(self.bot, profile[0])
+        for idx, (profile, charname, level) in enumerate(
+            zip(players, charnames, player_levels)
+        ):
             text = _(
                 "{name}, a character by {charname} with Level **{level}** (**{xp}** XP)"
             ).format(
                 charname=escape_markdown(charname),
                 name=escape_markdown(profile["name"]),
-                level=rpgtools.xptolevel(profile["xp"]),
+                level=level,
                 xp=profile["xp"],
             )
             result = f"{result}{idx + 1}. {text}\n"
@@ -955,11 +969,7 @@ class Guild(commands.Cog):
                 amount,
                 guild["id"],
             )
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                amount,
-                member.id,
-            )
+            await queries.execute(conn, "add_money", amount, member.id)
             await self.bot.log_transaction(
                 ctx,
                 from_=0,
@@ -1286,22 +1296,16 @@ class Guild(commands.Cog):
                     " **{user2}**!\nBattle running..."
                 ).format(num=idx + 1, total=len(team1), user=user, user2=user2)
             )
-            val1 = sum(await self.bot.get_damage_armor_for(user)) + random.randint(1, 7)
-            val2 = sum(await self.bot.get_damage_armor_for(user2)) + random.randint(
-                1, 7
+            winner_idx = duel(
+                sum(await self.bot.get_damage_armor_for(user)),
+                sum(await self.bot.get_damage_armor_for(user2)),
             )
-            if val1 > val2:
+            if winner_idx == 0:
                 winner = user
                 wins1 += 1
-            elif val2 > val1:
+            else:
                 winner = user2
                 wins2 += 1
-            else:
-                winner = random.choice([user, user2])
-                if winner == user:
-                    wins1 += 1
-                else:
-                    wins2 += 1
             await asyncio.sleep(5)
             await ctx.send(
                 _(
@@ -1328,11 +1332,7 @@ class Guild(commands.Cog):
                         guild1["id"],
                     )
                 else:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        amount,
-                        ctx.author.id,
-                    )
+                    await queries.execute(conn, "add_money", amount, ctx.author.id)
                     await self.bot.cache.update_profile_cols_rel(
                         ctx.author.id, money=amount
                     )
@@ -1360,11 +1360,7 @@ class Guild(commands.Cog):
                         guild2["id"],
                     )
                 else:
-                    await conn.execute(
-                        'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                        amount,
-                        enemy.id,
-                    )
+                    await queries.execute(conn, "add_money", amount, enemy.id)
                     await self.bot.cache.update_profile_cols_rel(
                         ctx.author.id, money=amount
                     )
@@ -1431,19 +1427,19 @@ class Guild(commands.Cog):
             ).format(author=ctx.author.mention, guild=guild["name"], id_=id_)
         )
 
-        difficulty = int(rpgtools.xptolevel(ctx.character_data["xp"]))
+        difficulty = int(levels.xptolevel(ctx.character_data["xp"]))
 
         await asyncio.sleep(60 * 10)
 
         a_joined = await self.bot.get_joins(id_)
         joined = []
 
-        async with self.bot.pool.acquire() as conn:
-            for u in a_joined:
-                user = await self.bot.cache.get_profile(u.id, conn=conn)
-                if user and user["guild"] == guild["id"]:
-                    difficulty += int(rpgtools.xptolevel(user["xp"]))
-                    joined.append(u)
+        profiles = await self.bot.cache.get_profiles([u.id for u in a_joined])
+        for u in a_joined:
+            user = profiles.get(u.id)
+            if user and user["guild"] == guild["id"]:
+                joined.append(u)
+        difficulty += sum(levels.xptolevels([profiles[u.id]["xp"] for u in joined]))
 
         if len(joined) < 3:
             await self.bot.reset_guild_cooldown(ctx)
@@ -1550,8 +1546,8 @@ Time it will take: **{time}**
         _(
             """Lists guild-specific cooldowns, meaning all guild members have these cooldowns and cannot use the commands."""
         )
-        cooldowns = await self.bot.redis.execute(
-            "KEYS", f"guildcd:{ctx.character_data['guild']}:*"
+        cooldowns = await self.bot.cooldowns.list(
+            "guildcd", ctx.character_data["guild"]
         )
         adv = await self.bot.get_guild_adventure(ctx.character_data["guild"])
         if not cooldowns and (not adv or adv[2]):
@@ -1559,10 +1555,7 @@ Time it will take: **{time}**
                 _("You don't have any active cooldown at the moment.")
             )
         timers = _("Commands on cooldown:")
-        for key in cooldowns:
-            key = key.decode()
-            cooldown = await self.bot.redis.execute("TTL", key)
-            cmd = key.replace(f"guildcd:{ctx.character_data['guild']}:", "")
+        for cmd, cooldown in cooldowns:
             text = _("{cmd} is on cooldown and will be available after {time}").format(
                 cmd=cmd, time=timedelta(seconds=int(cooldown))
             )
@@ -17,6 +17,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from asyncpg.exceptions import ForeignKeyViolationError, UniqueViolationError
 from discord.ext import commands
+from lru import LRU
 
 from utils import i18n
 from utils.i18n import _, locale_doc
@@ -25,7 +26,8 @@ from utils.i18n import _, locale_doc
 class Locale(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.bot.locale_cache = {}
+        # None means the user uses the default locale
+        self.bot.locale_cache = LRU(bot.config.locale_cache_size)
 
     async def set_locale(self, user, locale):
         """Sets the locale for a user."""
@@ -49,6 +51,9 @@ class Locale(commands.Cog):
                         user.id,
                     )
         self.bot.locale_cache[user.id] = locale
+        await self.bot.cogs["Sharding"].handler(
+            "update_locale_cache", 0, args={"user_id": user.id, "locale": locale}
+        )
 
     async def get_locale(self, user):
         """Gets the locale for a user from DB."""
@@ -56,10 +61,24 @@ class Locale(commands.Cog):
             'SELECT "locale" FROM user_settings WHERE "user"=$1;', user
         )
 
+    async def preload(self, user_ids):
+        """Loads the locales of many users into the cache with one query."""
+        user_ids = [i for i in set(user_ids) if i not in self.bot.locale_cache]
+        if not user_ids:
+            return
+        rows = await self.bot.pool.fetch(
+            'SELECT "user", "locale" FROM user_settings WHERE "user"=ANY($1);',
+            user_ids,
+        )
+        locales = {row["user"]: row["locale"] for row in rows}
+        for user in user_ids:
+            self.bot.locale_cache[user] = locales.get(user)
+
     async def locale(self, user):
-        lang = self.bot.locale_cache.get(user, None)
-        if lang:
-            return lang
+        try:
+            return self.bot.locale_cache[user]
+        except KeyError:
+            pass
         lang = await self.get_locale(user)
         self.bot.locale_cache[user] = lang
         return lang
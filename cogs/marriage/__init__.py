@@ -22,6 +22,7 @@ import discord
 from discord.ext import commands
 from discord.ext.commands.default import Author
 
+from classes import queries
 from classes.converters import IntFromTo, MemberWithCharacter, UserWithCharacter
 from cogs.help import chunks
 from cogs.shard_communication import user_on_cooldown as user_cooldown
@@ -294,11 +295,7 @@ class Marriage(commands.Cog):
                 item[1],
                 ctx.character_data["marriage"],
             )
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                item[1],
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", item[1], ctx.author.id)
             await self.bot.log_transaction(
                 ctx,
                 from_=ctx.author.id,
@@ -693,11 +690,7 @@ class Marriage(commands.Cog):
             )
             money = random.randint(0, int(ctx.character_data["money"] / 64))
             async with self.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "remove_money", money, ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=ctx.author.id,
@@ -729,11 +722,7 @@ class Marriage(commands.Cog):
             )
             money = random.randint(0, int(ctx.character_data["money"] / 64))
             async with self.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", money, ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=1,
@@ -37,6 +37,7 @@ import psutil
 from discord.ext import commands
 from discord.ext.commands import BucketType
 
+from classes import queries
 from classes.converters import (
     DateNewerThan,
     ImageFormat,
@@ -143,11 +144,7 @@ class Miscellaneous(commands.Cog):
             if await user_is_patron(self.bot, ctx.author, "silver"):
                 money = round(money * 1.5)
             async with self.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", money, ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=1,
@@ -269,9 +266,7 @@ class Miscellaneous(commands.Cog):
 
             Thank you for supporting IdleRPG!"""
         )
-        guild_count = sum(
-            await self.bot.cogs["Sharding"].handler("guild_count", self.bot.shard_count)
-        )
+        guild_count = await self.bot.cogs["Sharding"].get_guild_count()
         await ctx.send(
             _(
                 """\
@@ -354,9 +349,7 @@ Even $1 can help us.
             )
         else:
             owner = str(await self.bot.get_user_global(self.bot.owner_id))
-        guild_count = sum(
-            await self.bot.cogs["Sharding"].handler("guild_count", self.bot.shard_count)
-        )
+        guild_count = await self.bot.cogs["Sharding"].get_guild_count()
         meminfo = psutil.virtual_memory()
         cpu_freq = psutil.cpu_freq()
         cpu_name = await get_cpu_name()
@@ -84,6 +84,7 @@ class Owner(commands.Cog):
     async def reloadconf(self, ctx):
         try:
             importlib_reload(self.bot.config)
+            self.bot.load_class_tables()
         except Exception as e:
             await ctx.send(f"**`ERROR:`** {type(e).__name__} - {e}")
         else:
@@ -96,6 +97,48 @@ class Owner(commands.Cog):
             top_stats = snapshot.statistics("lineno")
             await ctx.send("```" + "\n".join([str(x) for x in top_stats[:10]]) + "```")
 
+    @commands.command(hidden=True)
+    async def cachestats(self, ctx):
+        """Shows the hit rate of this cluster's in-process profile cache."""
+        hits, misses = self.bot.cache.get_stats()
+        total = hits + misses
+        rate = round(hits / total * 100, 2) if total else 0
+        await ctx.send(
+            f"Profile cache: {len(self.bot.cache.local)} entries, {hits} hits,"
+            f" {misses} misses ({rate}% hit rate)"
+        )
+
+    @commands.command(hidden=True)
+    async def commandstats(self, ctx, count: int = 15):
+        """Shows the slowest commands on this cluster by total time spent."""
+        top = self.bot.profiler.top(count)
+        if not top:
+            return await ctx.send("No commands have been run yet.")
+        rows = [
+            (
+                i["command"],
+                i["count"],
+                i["p50"],
+                i["p95"],
+                i["p99"],
+                f"{i['pg_calls']} ({i['pg_time']}ms)",
+                f"{i['redis_calls']} ({i['redis_time']}ms)",
+                i["http_calls"],
+            )
+            for i in top
+        ]
+        headers = ("command", "runs", "p50", "p95", "p99", "pg", "redis", "http")
+        await ctx.send(f"```\n{tabulate(rows, headers=headers, tablefmt='psql')}\n```")
+
+    @commands.command(hidden=True)
+    async def rebuildleaderboards(self, ctx):
+        """Bulk loads the Redis leaderboards from Postgres."""
+        await ctx.trigger_typing()
+        count = await self.bot.cache.rebuild_leaderboards()
+        if count is None:
+            return await ctx.send("The leaderboards are already being rebuilt.")
+        await ctx.send(f"Rebuilt the leaderboards with {count} profiles.")
+
     @commands.command(hidden=True)
     async def makeluck(self, ctx):
         """Sets the luck for all gods to a random value and give bonus luck to the top 25 followers."""
@@ -270,6 +313,41 @@ class Owner(commands.Cog):
         else:
             await ctx.send(f"```{ret}```")
 
+    @commands.command(hidden=True)
+    async def slowsql(self, ctx, index: int = None):
+        """[Owner Only] Shows the slow query log or the details of one query."""
+        top = self.bot.slow_queries.top(10)
+        if not top:
+            return await ctx.send("No slow queries yet.")
+        if index is None:
+            rows = [
+                (
+                    idx,
+                    i.count,
+                    round(i.total),
+                    round(i.total / i.count),
+                    round(i.max),
+                    textwrap.shorten(i.query, width=60),
+                )
+                for idx, i in enumerate(top, start=1)
+            ]
+            headers = ("#", "runs", "total", "avg", "max", "query")
+            return await ctx.send(
+                f"```\n{tabulate(rows, headers=headers, tablefmt='psql')}\n```"
+            )
+        try:
+            entry = top[index - 1]
+        except IndexError:
+            return await ctx.send("No such query.")
+        shapes = "\n".join(
+            f"{count}x ({shape})" for shape, count in entry.shapes.items()
+        )
+        plan = entry.plans[-1] if entry.plans else "No plan captured."
+        await ctx.send(
+            f"```sql\n{entry.query[:1400]}```Arguments:```\n{shapes[:400]}```"
+        )
+        await ctx.send(f"```\n{plan[:1990]}```")
+
     @commands.command(hidden=True)
     async def runas(self, ctx, member: MemberConverter, *, command: str):
         """[Owner Only] Run a command as if you were the user."""
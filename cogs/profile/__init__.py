@@ -26,10 +26,11 @@ from aiohttp import ContentTypeError
 from discord.ext import commands
 from discord.ext.commands.default import Author
 
+from classes import queries
 from classes.converters import IntFromTo, MemberWithCharacter, User, UserWithCharacter
 from cogs.help import chunks
 from cogs.shard_communication import user_on_cooldown as user_cooldown
-from utils import checks, colors
+from utils import checks, colors, levels
 from utils import misc as rpgtools
 from utils.i18n import _, locale_doc
 
@@ -110,25 +111,27 @@ IdleRPG is a global bot, your characters are valid everywhere"""
                     100,
                     0,
                 )
-                await self.bot.create_item(
-                    name=_("Starter Sword"),
-                    value=0,
-                    type_="Sword",
-                    damage=3.0,
-                    armor=0.0,
-                    owner=ctx.author,
-                    hand="any",
-                    equipped=True,
-                    conn=conn,
-                )
-                await self.bot.create_item(
-                    name=_("Starter Shield"),
-                    value=0,
-                    type_="Shield",
-                    damage=0.0,
-                    armor=3.0,
-                    owner=ctx.author,
-                    hand="left",
+                await self.bot.create_items_bulk(
+                    [
+                        dict(
+                            name=_("Starter Sword"),
+                            value=0,
+                            type_="Sword",
+                            damage=3.0,
+                            armor=0.0,
+                            owner=ctx.author,
+                            hand="any",
+                        ),
+                        dict(
+                            name=_("Starter Shield"),
+                            value=0,
+                            type_="Shield",
+                            damage=0.0,
+                            armor=3.0,
+                            owner=ctx.author,
+                            hand="left",
+                        ),
+                    ],
                     equipped=True,
                     conn=conn,
                 )
@@ -220,7 +223,7 @@ IdleRPG is a global bot, your characters are valid everywhere"""
                     "defense": shielddef,
                     "sword_name": right_hand,
                     "shield_name": left_hand,
-                    "level": f"{rpgtools.xptolevel(profile['xp'])}",
+                    "level": f"{levels.xptolevel(profile['xp'])}",
                     "money": f"{profile['money']}",
                     "pvp_wins": f"{profile['pvpwins']}",
                     "marriage": i
@@ -329,7 +332,7 @@ IdleRPG is a global bot, your characters are valid everywhere"""
             if left_hand
             else _("None Equipped")
         )
-        level = rpgtools.xptolevel(p_data["xp"])
+        level = levels.xptolevel(p_data["xp"])
         em = discord.Embed(colour=colour, title=f"{target}: {p_data['name']}")
         em.set_thumbnail(url=target.avatar_url)
         em.add_field(
@@ -440,8 +443,8 @@ IdleRPG is a global bot, your characters are valid everywhere"""
                     " **{level}**. Missing to next level: **{missing}**"
                 ).format(
                     points=points,
-                    level=rpgtools.xptolevel(points),
-                    missing=rpgtools.xptonextlevel(points),
+                    level=levels.xptolevel(points),
+                    missing=levels.xptonextlevel(points),
                 )
             )
         else:
@@ -453,8 +456,8 @@ IdleRPG is a global bot, your characters are valid everywhere"""
                 ).format(
                     user=user,
                     points=points,
-                    level=rpgtools.xptolevel(points),
-                    missing=rpgtools.xptonextlevel(points),
+                    level=levels.xptolevel(points),
+                    missing=levels.xptonextlevel(points),
                 )
             )
 
@@ -658,7 +661,7 @@ IdleRPG is a global bot, your characters are valid everywhere"""
         ).paginate(ctx)
         reward = ["money", "xp"][reward]
         if reward == "xp":
-            old_level = rpgtools.xptolevel(ctx.character_data["xp"])
+            old_level = levels.xptolevel(ctx.character_data["xp"])
             value = value // 4
 
         async with self.bot.pool.acquire() as conn:
@@ -703,7 +706,7 @@ IdleRPG is a global bot, your characters are valid everywhere"""
         await ctx.send(text + (additional if len(loot_ids) > count else ""))
 
         if reward == "xp":
-            new_level = int(rpgtools.xptolevel(ctx.character_data["xp"] + value))
+            new_level = int(levels.xptolevel(ctx.character_data["xp"] + value))
             if old_level != new_level:
                 await self.bot.process_levelup(ctx, new_level, old_level)
 
@@ -992,11 +995,7 @@ IdleRPG is a global bot, your characters are valid everywhere"""
                 f'UPDATE allitems SET {stattoupgrade}={stattoupgrade}+1 WHERE "id"=$1;',
                 itemid,
             )
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                pricetopay,
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", pricetopay, ctx.author.id)
             await self.bot.log_transaction(
                 ctx,
                 from_=ctx.author.id,
@@ -25,12 +25,14 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import IntGreaterThan
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import random
 from utils.checks import AlreadyRaiding, has_char, is_gm, is_god
 from utils.i18n import _, locale_doc
 from utils.misc import nice_join
+from utils.raid import BossRaid, RaidPresenter, getfinaldmg
 
 
 def raid_channel():
@@ -78,7 +80,84 @@ class Raid(commands.Cog):
         )
 
     def getfinaldmg(self, damage: Decimal, defense):
-        return v if (v := damage - defense) > 0 else 0
+        return getfinaldmg(damage, defense)
+
+    def boss_turn_messages(
+        self,
+        turn,
+        boss,
+        image,
+        raid_title,
+        attack_title=None,
+        raid_image="knight.jpg",
+        mention=True,
+    ):
+        """Renders a boss raid turn as the boss' attack and the raid's attack"""
+        target = turn.target
+        if not turn.died:
+            description = f"{target} now has {turn.target_hp} HP!"
+        else:
+            description = f"{target} died!"
+        em = discord.Embed(
+            title=attack_title or f"{boss} attacked!",
+            description=description,
+            colour=0xffb900,
+        )
+        em.add_field(name="Theoretical Damage", value=turn.damage + turn.armor)
+        em.add_field(name="Shield", value=turn.armor)
+        em.add_field(name="Effective Damage", value=turn.damage)
+        em.set_author(name=str(target), icon_url=target.avatar_url)
+        em.set_thumbnail(url=f"{self.bot.BASE_URL}/{image}")
+        attack = {"embed": em}
+        if mention:
+            attack["content"] = target.mention
+        em = discord.Embed(title=raid_title, colour=0xff5c00)
+        em.set_thumbnail(url=f"{self.bot.BASE_URL}/{raid_image}")
+        em.add_field(name="Damage", value=turn.raid_damage)
+        em.add_field(
+            name="HP left", value=turn.boss_hp if turn.boss_hp > 0 else "Dead!"
+        )
+        return [attack, {"embed": em}]
+
+    def asmodeus_turn_messages(self, turn):
+        target = turn.target
+        em = discord.Embed(title="Asmodeus Raid", colour=0xffb900)
+        if not turn.died:
+            em.add_field(name="Attack Target", value=f"{target} ({turn.target_hp} HP)")
+        else:
+            em.add_field(name="Attack Target", value=f"{target} (Now dead!)")
+        em.add_field(name="Theoretical Damage", value=turn.damage + turn.armor)
+        em.add_field(name="Shield", value=turn.armor)
+        em.add_field(name="Effective Damage", value=turn.damage)
+        em.set_author(name=str(target), icon_url=target.avatar_url)
+        em.set_thumbnail(url=f"{self.bot.BASE_URL}/asmodeus.png")
+        em.add_field(name="Raid Damage", value=turn.raid_damage)
+        em.add_field(
+            name="Asmodeus HP", value=turn.boss_hp if turn.boss_hp > 0 else "Dead!"
+        )
+        return [{"embed": em}]
+
+    def summarize_turns(self, boss, turns):
+        """Renders several boss raid turns that are sent at once"""
+        lines = []
+        for turn in turns:
+            if not turn.died:
+                result = f"{turn.target_hp} HP left"
+            else:
+                result = "died"
+            lines.append(
+                f"{boss} hit {turn.target} for {turn.damage} ({result}), the raid"
+                f" dealt {turn.raid_damage}"
+            )
+        em = discord.Embed(
+            title=f"{len(turns)} turns passed!",
+            description="\n".join(lines),
+            colour=0xffb900,
+        )
+        em.add_field(
+            name="HP left", value=turn.boss_hp if turn.boss_hp > 0 else "Dead!"
+        )
+        return {"embed": em}
 
     async def set_raid_timer(self):
         await self.bot.redis.execute(
@@ -197,73 +276,24 @@ class Raid(commands.Cog):
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if not (profile := await self.bot.cache.get_profile(u.id, conn=conn)):
-                    continue
-                dmg, deff = await self.bot.get_raidstats(
-                    u,
-                    atkmultiply=profile["atkmultiply"],
-                    defmultiply=profile["defmultiply"],
-                    classes=profile["class"],
-                    race=profile["race"],
-                    guild=profile["guild"],
-                    conn=conn,
-                )
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         raiders_joined = len(raid)
         await ctx.send(f"**Done getting data! {raiders_joined} Raiders joined.**")
         start = datetime.datetime.utcnow()
 
-        while (
-            self.boss["hp"] > 0
-            and len(raid) > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=45)
-        ):
-            target = random.choice(list(raid.keys()))  # the guy it will attack
-            dmg = random.randint(
-                self.boss["min_dmg"], self.boss["max_dmg"]
-            )  # effective damage the dragon does
-            finaldmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= finaldmg  # damage dealt
-            if raid[target]["hp"] > 0:
-                em = discord.Embed(
-                    title="Zerekiel attacked!",
-                    description=f"{target} now has {raid[target]['hp']} HP!",
-                    colour=0xffb900,
-                )
-            else:
-                em = discord.Embed(
-                    title="Zerekiel attacked!",
-                    description=f"{target} died!",
-                    colour=0xffb900,
-                )
-            em.add_field(
-                name="Theoretical Damage", value=finaldmg + raid[target]["armor"]
-            )
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=finaldmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/dragon.jpg")
-            await ctx.send(target.mention, embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-            dmg_to_take = sum(i["damage"] for i in raid.values())
-            self.boss["hp"] -= dmg_to_take
-            await asyncio.sleep(4)
-            em = discord.Embed(title="The raid attacked Zerekiel!", colour=0xff5c00)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/knight.jpg")
-            em.add_field(name="Damage", value=dmg_to_take)
-            if self.boss["hp"] > 0:
-                em.add_field(name="HP left", value=self.boss["hp"])
-            else:
-                em.add_field(name="HP left", value="Dead!")
-            await ctx.send(embed=em)
-            await asyncio.sleep(4)
+        await RaidPresenter(
+            ctx,
+            lambda turn: self.boss_turn_messages(
+                turn, "Zerekiel", "dragon.jpg", "The raid attacked Zerekiel!"
+            ),
+            lambda turns: self.summarize_turns("Zerekiel", turns),
+        ).play(BossRaid(raid, self.boss), time_limit=45 * 60)
 
         if len(raid) == 0:
             m = await ctx.send("The raid was all wiped!")
@@ -473,63 +503,23 @@ class Raid(commands.Cog):
         boss_hp = len(a_joined) * 1500
 
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for u in a_joined:
-                if not (profile := await self.bot.cache.get_profile(u.id, conn=conn)):
-                    continue
-                dmg, deff = await self.bot.get_raidstats(
-                    u,
-                    atkmultiply=profile["atkmultiply"],
-                    defmultiply=profile["defmultiply"],
-                    classes=profile["class"],
-                    race=profile["race"],
-                    guild=profile["guild"],
-                    conn=conn,
-                )
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            stats = await self.bot.get_raidstats_bulk(a_joined, conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         raiders_joined = len(raid)
         await ctx.send(f"**Done getting data! {raiders_joined} Raiders joined.**")
 
-        while boss_hp > 0 and len(raid) > 0:
-            target = random.choice(list(raid.keys()))  # the guy it will attack
-            dmg = random.randint(0, 450)  # effective damage the dragon does
-            finaldmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= finaldmg  # damage dealt
-            if raid[target]["hp"] > 0:
-                em = discord.Embed(
-                    title="Cthulhu attacked!",
-                    description=f"{target} now has {raid[target]['hp']} HP!",
-                    colour=0xffb900,
-                )
-            else:
-                em = discord.Embed(
-                    title="Cthulhu attacked!",
-                    description=f"{target} died!",
-                    colour=0xffb900,
-                )
-            em.add_field(
-                name="Theoretical Damage", value=finaldmg + raid[target]["armor"]
-            )
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=finaldmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/cthulhu.jpg")
-            await ctx.send(target.mention, embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-            dmg_to_take = sum(i["damage"] for i in raid.values())
-            boss_hp -= dmg_to_take
-            await asyncio.sleep(4)
-            em = discord.Embed(title="The raid attacked Cthulhu!", colour=0xff5c00)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/knight.jpg")
-            em.add_field(name="Damage", value=dmg_to_take)
-            if boss_hp > 0:
-                em.add_field(name="HP left", value=boss_hp)
-            else:
-                em.add_field(name="HP left", value="Dead!")
-            await ctx.send(embed=em)
-            await asyncio.sleep(4)
+        boss = {"hp": boss_hp, "min_dmg": 0, "max_dmg": 450}
+        await RaidPresenter(
+            ctx,
+            lambda turn: self.boss_turn_messages(
+                turn, "Cthulhu", "cthulhu.jpg", "The raid attacked Cthulhu!"
+            ),
+            lambda turns: self.summarize_turns("Cthulhu", turns),
+        ).play(BossRaid(raid, boss))
 
         if len(raid) == 0:
             await ctx.send("The raid was all wiped!")
@@ -590,14 +580,12 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
             raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Guilt"
-                ):
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            profiles = await self.bot.cache.get_profiles(
+                [u.id for u in users], conn=conn
+            )
+            for u in users:
+                if not (profile := profiles.get(u.id)) or profile["god"] != "Guilt":
                     continue
                 raid[u] = 250
 
@@ -725,30 +713,12 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Kvothe"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        god=profile["god"],
-                        conn=conn,
-                    )
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 100, "armor": deff, "damage": dmg, "kills": 0}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, god="Kvothe", conn=conn)
+            raid = {
+                u: {"hp": 100, "armor": deff, "damage": dmg, "kills": 0}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
@@ -801,11 +771,7 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
                 )
             else:
                 money = random.randint(250, 750)
-                await self.bot.pool.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    target.id,
-                )
+                await queries.execute(self.bot.pool, "add_money", money, target.id)
                 await self.bot.cache.update_profile_cols_rel(target.id, money=money)
                 scrael.pop(0)
                 em.add_field(
@@ -898,78 +864,28 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Eden"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        god=profile["god"],
-                        conn=conn,
-                    )
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, god="Eden", conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
-        start = datetime.datetime.utcnow()
-
-        while (
-            self.boss["hp"] > 0
-            and len(raid) > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=45)
-        ):
-            target = random.choice(list(raid.keys()))  # the guy it will attack
-            dmg = random.randint(self.boss["min_dmg"], self.boss["max_dmg"])
-            dmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= dmg  # damage dealt
-            if raid[target]["hp"] > 0:
-                em = discord.Embed(
-                    title="The Guardian attacks the seekers of the garden!",
-                    description=f"{target} now has {raid[target]['hp']} HP!",
-                    colour=0xffb900,
-                )
-            else:
-                em = discord.Embed(
-                    title="The Guardian attacks the seekers of the garden!",
-                    description=f"{target} died!",
-                    colour=0xffb900,
-                )
-            em.add_field(name="Theoretical Damage", value=dmg + raid[target]["armor"])
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=dmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/guardian_small.jpg")
-            await ctx.send(embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-            dmg_to_take = sum(i["damage"] for i in raid.values())
-            self.boss["hp"] -= dmg_to_take
-            await asyncio.sleep(4)
-            em = discord.Embed(
-                title="The seekers attacked the Guardian!", colour=0xff5c00
-            )
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/eden_followers.jpg")
-            em.add_field(name="Damage", value=dmg_to_take)
-            if self.boss["hp"] > 0:
-                em.add_field(name="HP left", value=self.boss["hp"])
-            else:
-                em.add_field(name="HP left", value="Dead!")
-            await ctx.send(embed=em)
-            await asyncio.sleep(4)
+        await RaidPresenter(
+            ctx,
+            lambda turn: self.boss_turn_messages(
+                turn,
+                "The Guardian",
+                "guardian_small.jpg",
+                "The seekers attacked the Guardian!",
+                attack_title="The Guardian attacks the seekers of the garden!",
+                raid_image="eden_followers.jpg",
+                mention=False,
+            ),
+            lambda turns: self.summarize_turns("The Guardian", turns),
+        ).play(BossRaid(raid, self.boss), time_limit=45 * 60)
 
         if len(raid) == 0:
             await ctx.send("The raid was all wiped!")
@@ -1070,14 +986,12 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
             raid = []
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    await self.bot.cache.get_profile_col(u.id, "god", conn=conn)
-                    != "Tet"
-                ):
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            profiles = await self.bot.cache.get_profiles(
+                [u.id for u in users], conn=conn
+            )
+            for u in users:
+                if not (profile := profiles.get(u.id)) or profile["god"] != "Tet":
                     continue
                 raid.append(u)
 
@@ -1216,78 +1130,26 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "CHamburr"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        god=profile["god"],
-                        conn=conn,
-                    )
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, god="CHamburr", conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
-        start = datetime.datetime.utcnow()
-
-        while (
-            self.boss["hp"] > 0
-            and len(raid) > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=45)
-        ):
-            target = random.choice(list(raid.keys()))  # the guy it will attack
-            dmg = random.randint(self.boss["min_dmg"], self.boss["max_dmg"])
-            dmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= dmg  # damage dealt
-            if raid[target]["hp"] > 0:
-                em = discord.Embed(
-                    title="Hamburger attacked!",
-                    description=f"{target} now has {raid[target]['hp']} HP!",
-                    colour=0xffb900,
-                )
-            else:
-                em = discord.Embed(
-                    title="Hamburger attacked!",
-                    description=f"{target} died!",
-                    colour=0xffb900,
-                )
-            em.add_field(name="Theoretical Damage", value=dmg + raid[target]["armor"])
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=dmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/hamburger.jpg")
-            await ctx.send(embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-            dmg_to_take = sum(i["damage"] for i in raid.values())
-            self.boss["hp"] -= dmg_to_take
-            await asyncio.sleep(4)
-            em = discord.Embed(
-                title="The raid attacked the hamburger!", colour=0xff5c00
-            )
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/knight.jpg")
-            em.add_field(name="Damage", value=dmg_to_take)
-            if self.boss["hp"] > 0:
-                em.add_field(name="HP left", value=self.boss["hp"])
-            else:
-                em.add_field(name="HP left", value="Dead!")
-            await ctx.send(embed=em)
-            await asyncio.sleep(4)
+        await RaidPresenter(
+            ctx,
+            lambda turn: self.boss_turn_messages(
+                turn,
+                "Hamburger",
+                "hamburger.jpg",
+                "The raid attacked the hamburger!",
+                mention=False,
+            ),
+            lambda turns: self.summarize_turns("Hamburger", turns),
+        ).play(BossRaid(raid, self.boss), time_limit=45 * 60)
 
         if len(raid) == 0:
             await ctx.send("The raid was all wiped!")
@@ -1450,30 +1312,14 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Salutations"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        god=profile["god"],
-                        conn=conn,
-                    )
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(
+                users, god="Salutations", conn=conn
+            )
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
@@ -1772,66 +1618,21 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Asmodeus"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(
-                        u,
-                        atkmultiply=profile["atkmultiply"],
-                        defmultiply=profile["defmultiply"],
-                        classes=profile["class"],
-                        race=profile["race"],
-                        guild=profile["guild"],
-                        god=profile["god"],
-                        conn=conn,
-                    )
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, god="Asmodeus", conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
-        start = datetime.datetime.utcnow()
-
-        while (
-            self.boss["hp"] > 0
-            and len(raid) > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=45)
-        ):
-            target = random.choice(list(raid.keys()))
-            dmg = random.randint(self.boss["min_dmg"], self.boss["max_dmg"])
-            dmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= dmg
-            raid_dmg = sum(i["damage"] for i in raid.values())
-            self.boss["hp"] -= raid_dmg
-            em = discord.Embed(title="Asmodeus Raid", colour=0xffb900)
-            if (hp := raid[target]["hp"]) > 0:
-                em.add_field(name="Attack Target", value=f"{target} ({hp} HP)")
-            else:
-                em.add_field(name="Attack Target", value=f"{target} (Now dead!)")
-            em.add_field(name="Theoretical Damage", value=dmg + raid[target]["armor"])
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=dmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/asmodeus.png")
-            em.add_field(name="Raid Damage", value=raid_dmg)
-            em.add_field(
-                name="Asmodeus HP",
-                value=boss_hp if (boss_hp := self.boss["hp"]) > 0 else "Dead!",
-            )
-            await ctx.send(embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-
-            await asyncio.sleep(4)
+        await RaidPresenter(
+            ctx,
+            self.asmodeus_turn_messages,
+            lambda turns: self.summarize_turns("Asmodeus", turns),
+            turn_interval=4,
+        ).play(BossRaid(raid, self.boss, dead_attack=True), time_limit=45 * 60)
 
         if len(raid) == 0:
             await ctx.send("The raid was all wiped!")
@@ -1921,67 +1722,26 @@ Quick and ugly: <https://discord.com/oauth2/authorize?client_id=4539639655219855
         ) as r:
             raid_raw = await r.json()
         async with self.bot.pool.acquire() as conn:
-            raid = {}
-            for i in raid_raw:
-                u = await self.bot.get_user_global(i)
-                if not u:
-                    continue
-                if (
-                    not (profile := await self.bot.cache.get_profile(u.id, conn=conn))
-                    or profile["god"] != "Jesus"
-                ):
-                    continue
-                try:
-                    dmg, deff = await self.bot.get_raidstats(u, god="Jesus", conn=conn)
-                except ValueError:
-                    continue
-                raid[u] = {"hp": 250, "armor": deff, "damage": dmg}
+            users = [u for i in raid_raw if (u := await self.bot.get_user_global(i))]
+            stats = await self.bot.get_raidstats_bulk(users, god="Jesus", conn=conn)
+            raid = {
+                u: {"hp": 250, "armor": deff, "damage": dmg}
+                for u, (dmg, deff) in stats.items()
+            }
 
         await ctx.send("**Done getting data!**")
 
-        start = datetime.datetime.utcnow()
-
-        while (
-            self.boss["hp"] > 0
-            and len(raid) > 0
-            and datetime.datetime.utcnow() < start + datetime.timedelta(minutes=45)
-        ):
-            target = random.choice(list(raid.keys()))
-            dmg = random.randint(self.boss["min_dmg"], self.boss["max_dmg"])
-            dmg = self.getfinaldmg(dmg, raid[target]["armor"])
-            raid[target]["hp"] -= dmg
-            if raid[target]["hp"] > 0:
-                em = discord.Embed(
-                    title="Atheistus attacked!",
-                    description=f"{target} now has {raid[target]['hp']} HP!",
-                    colour=0xffb900,
-                )
-            else:
-                em = discord.Embed(
-                    title="Atheistus attacked!",
-                    description=f"{target} died!",
-                    colour=0xffb900,
-                )
-            em.add_field(name="Theoretical Damage", value=dmg + raid[target]["armor"])
-            em.add_field(name="Shield", value=raid[target]["armor"])
-            em.add_field(name="Effective Damage", value=dmg)
-            em.set_author(name=str(target), icon_url=target.avatar_url)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/atheistus.jpg")
-            await ctx.send(embed=em)
-            if raid[target]["hp"] <= 0:
-                del raid[target]
-            dmg_to_take = sum(i["damage"] for i in raid.values())
-            self.boss["hp"] -= dmg_to_take
-            await asyncio.sleep(4)
-            em = discord.Embed(title="The raid attacked Atheistus!", colour=0xff5c00)
-            em.set_thumbnail(url=f"{self.bot.BASE_URL}/knight.jpg")
-            em.add_field(name="Damage", value=dmg_to_take)
-            if self.boss["hp"] > 0:
-                em.add_field(name="HP left", value=self.boss["hp"])
-            else:
-                em.add_field(name="HP left", value="Dead!")
-            await ctx.send(embed=em)
-            await asyncio.sleep(4)
+        await RaidPresenter(
+            ctx,
+            lambda turn: self.boss_turn_messages(
+                turn,
+                "Atheistus",
+                "atheistus.jpg",
+                "The raid attacked Atheistus!",
+                mention=False,
+            ),
+            lambda turns: self.summarize_turns("Atheistus", turns),
+        ).play(BossRaid(raid, self.boss), time_limit=45 * 60)
 
         if len(raid) == 0:
             await ctx.send("The raid was all wiped!")
@@ -19,6 +19,7 @@ import discord
 
 from discord.ext import commands
 
+from utils import levels
 from utils import misc as rpgtools
 from utils.i18n import _, locale_doc
 from utils.markdown import escape_markdown
@@ -28,18 +29,24 @@ class Ranks(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def get_top_profiles(self, column):
+        """Returns the top 10 profiles by a column, preferably from the leaderboards"""
+        if ids := await self.bot.cache.get_top(column):
+            profiles = await self.bot.cache.get_profiles(ids)
+            return [profiles[i] for i in ids if i in profiles]
+        return await self.bot.pool.fetch(
+            f'SELECT * FROM profile ORDER BY "{column}" DESC LIMIT 10;'
+        )
+
     @commands.command(brief=_("Show the top 10 richest"))
     @locale_doc
     async def richest(self, ctx):
         _("""The 10 most richest players in IdleRPG.""")
         await ctx.trigger_typing()
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "money" FROM profile ORDER BY "money" DESC'
-            " LIMIT 10;"
-        )
+        players = await self.get_top_profiles("money")
+        usernames = await rpgtools.lookup_many(self.bot, [p["user"] for p in players])
         result = ""
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (profile, username) in enumerate(zip(players, usernames)):
             text = _("{name}, a character by {username} with **${money}**").format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
@@ -58,18 +65,19 @@ class Ranks(commands.Cog):
             """Shows you the top 10 players by XP and displays the corresponding level."""
         )
         await ctx.trigger_typing()
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "xp" from profile ORDER BY "xp" DESC LIMIT 10;'
-        )
+        players = await self.get_top_profiles("xp")
+        usernames = await rpgtools.lookup_many(self.bot, [p["user"] for p in players])
+        player_levels = levels.xptolevels([p["xp"] for p in players])
         result = ""
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (profile, username, level) in enumerate(
+            zip(players, usernames, player_levels)
+        ):
             text = _(
                 "{name}, a character by {username} with Level **{level}** (**{xp}** XP)"
             ).format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
-                level=rpgtools.xptolevel(profile["xp"]),
+                level=level,
                 xp=profile["xp"],
             )
             result = f"{result}{idx + 1}. {text}\n"
@@ -83,13 +91,10 @@ class Ranks(commands.Cog):
     async def pvpstats(self, ctx):
         _("""Shows you the top 10 players by the amount of wins in PvP matches.""")
         await ctx.trigger_typing()
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "name", "pvpwins" from profile ORDER BY "pvpwins" DESC'
-            " LIMIT 10;"
-        )
+        players = await self.get_top_profiles("pvpwins")
+        usernames = await rpgtools.lookup_many(self.bot, [p["user"] for p in players])
         result = ""
-        for idx, profile in enumerate(players):
-            username = await rpgtools.lookup(self.bot, profile["user"])
+        for idx, (profile, username) in enumerate(zip(players, usernames)):
             text = _("{name}, a character by {username} with **{wins}** wins").format(
                 name=escape_markdown(profile["name"]),
                 username=escape_markdown(username),
@@ -106,14 +111,13 @@ class Ranks(commands.Cog):
     async def lovers(self, ctx):
         _("""The top 10 lovers sorted by their spouse's lovescore.""")
         await ctx.trigger_typing()
-        players = await self.bot.pool.fetch(
-            'SELECT "user", "marriage", "lovescore" FROM profile ORDER BY "lovescore"'
-            " DESC LIMIT 10;"
+        players = await self.get_top_profiles("lovescore")
+        names = await rpgtools.lookup_many(
+            self.bot, [i for p in players for i in (p["user"], p["marriage"])]
         )
         result = ""
         for idx, profile in enumerate(players):
-            lovee = await rpgtools.lookup(self.bot, profile["user"])
-            lover = await rpgtools.lookup(self.bot, profile["marriage"])
+            lovee, lover = names[idx * 2], names[idx * 2 + 1]
             text = _(
                 "**{lover}** gifted their love **{lovee}** items worth **${points}**"
             ).format(
@@ -28,6 +28,13 @@ class Server(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def update_prefix(self, guild_id, prefix):
+        """Sets a guild's prefix on this and all other clusters"""
+        self.bot.set_prefix(guild_id, prefix)
+        await self.bot.cogs["Sharding"].handler(
+            "update_prefix", 0, args={"guild_id": guild_id, "prefix": prefix}
+        )
+
     @commands.guild_only()
     @commands.command(aliases=["server"], brief=_("Displays info on the server"))
     @locale_doc
@@ -107,7 +114,6 @@ Server created at: `{created_at}`"""
             return await ctx.send(_("Prefixes may not be longer than 10 characters."))
         if self.bot.all_prefixes.get(ctx.guild.id):
             if prefix == self.bot.config.global_prefix:
-                del self.bot.all_prefixes[ctx.guild.id]
                 await self.bot.pool.execute(
                     'DELETE FROM server WHERE "id"=$1;', ctx.guild.id
                 )
@@ -121,8 +127,7 @@ Server created at: `{created_at}`"""
                 ctx.guild.id,
                 prefix,
             )
-        if prefix != self.bot.config.global_prefix:
-            self.bot.all_prefixes[ctx.guild.id] = prefix
+        await self.update_prefix(ctx.guild.id, prefix)
         await ctx.send(_("Prefix changed to `{prefix}`.").format(prefix=prefix))
 
     @commands.has_permissions(manage_guild=True)
@@ -131,7 +136,7 @@ Server created at: `{created_at}`"""
     async def reset(self, ctx):
         _("""Resets the server settings.""")
         await self.bot.pool.execute('DELETE FROM server WHERE "id"=$1;', ctx.guild.id)
-        self.bot.all_prefixes.pop(ctx.guild.id, None)
+        await self.update_prefix(ctx.guild.id, None)
         await ctx.send(_("Done!"))
 
     @commands.guild_only()
@@ -16,17 +16,17 @@ You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
-import json
 
 from datetime import datetime, timedelta
 from time import time
 from uuid import uuid4
 
-import discord
+import psutil
 
 from async_timeout import timeout
 from discord.ext import commands
 
+from utils import codec
 from utils.eval import evaluate as _evaluate
 from utils.i18n import _, locale_doc
 from utils.misc import nice_join
@@ -39,15 +39,10 @@ def user_on_cooldown(cooldown: int, identifier: str = None):
             cmd_id = ctx.command.qualified_name
         else:
             cmd_id = identifier
-        command_ttl = await ctx.bot.redis.execute("TTL", f"cd:{ctx.author.id}:{cmd_id}")
-        if command_ttl == -2:
-            await ctx.bot.redis.execute(
-                "SET",
-                f"cd:{ctx.author.id}:{cmd_id}",
-                cmd_id,
-                "EX",
-                cooldown,
-            )
+        acquired, command_ttl = await ctx.bot.cooldowns.acquire(
+            "cd", ctx.author.id, cmd_id, cooldown
+        )
+        if acquired:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl)
@@ -66,17 +61,10 @@ def guild_on_cooldown(cooldown: int):
             )
         else:
             guild = guild["guild"]
-        command_ttl = await ctx.bot.redis.execute(
-            "TTL", f"guildcd:{guild}:{ctx.command.qualified_name}"
+        acquired, command_ttl = await ctx.bot.cooldowns.acquire(
+            "guildcd", guild, ctx.command.qualified_name, cooldown
         )
-        if command_ttl == -2:
-            await ctx.bot.redis.execute(
-                "SET",
-                f"guildcd:{guild}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                cooldown,
-            )
+        if acquired:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl)
@@ -101,17 +89,10 @@ def alliance_on_cooldown(cooldown: int):
                 'SELECT alliance FROM guild WHERE "id"=$1;', guild
             )
 
-        command_ttl = await ctx.bot.redis.execute(
-            "TTL", f"alliancecd:{alliance}:{ctx.command.qualified_name}"
+        acquired, command_ttl = await ctx.bot.cooldowns.acquire(
+            "alliancecd", alliance, ctx.command.qualified_name, cooldown
         )
-        if command_ttl == -2:
-            await ctx.bot.redis.execute(
-                "SET",
-                f"alliancecd:{alliance}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                cooldown,
-            )
+        if acquired:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl)
@@ -122,20 +103,13 @@ def alliance_on_cooldown(cooldown: int):
 
 def next_day_cooldown():
     async def predicate(ctx):
-        command_ttl = await ctx.bot.redis.execute(
-            "TTL", f"cd:{ctx.author.id}:{ctx.command.qualified_name}"
+        ctt = int(
+            86400 - (time() % 86400)
+        )  # Calculate the number of seconds until next UTC midnight
+        acquired, command_ttl = await ctx.bot.cooldowns.acquire(
+            "cd", ctx.author.id, ctx.command.qualified_name, ctt
         )
-        if command_ttl == -2:
-            ctt = int(
-                86400 - (time() % 86400)
-            )  # Calculate the number of seconds until next UTC midnight
-            await ctx.bot.redis.execute(
-                "SET",
-                f"cd:{ctx.author.id}:{ctx.command.qualified_name}",
-                ctx.command.qualified_name,
-                "EX",
-                ctt,
-            )
+        if acquired:
             return True
         else:
             raise commands.CommandOnCooldown(ctx, command_ttl)
@@ -144,39 +118,152 @@ def next_day_cooldown():
     return commands.check(predicate)  # TODO: Needs a redesign
 
 
+# How often every cluster publishes its stats (seconds)
+HEARTBEAT_INTERVAL = 15
+# Heartbeats older than this are removed, e.g. of clusters that no longer exist
+HEARTBEAT_EXPIRY = 3600
+
+
+# The gateway payload fields needed to build the objects of wait_for_dms
+DM_EVENT_FIELDS = {
+    "MESSAGE_CREATE": {
+        "id",
+        "channel_id",
+        "type",
+        "content",
+        "author",
+        "attachments",
+        "embeds",
+        "mentions",
+        "mention_roles",
+        "mention_everyone",
+        "tts",
+        "pinned",
+        "flags",
+        "timestamp",
+        "edited_timestamp",
+    },
+    "MESSAGE_REACTION_ADD": {"user_id", "channel_id", "message_id", "emoji"},
+}
+
+
 class Sharding(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.communication_channel = bot.config.shard_announce_channel
+        # replies to our own requests only go to this channel
+        self.reply_channel = f"{self.communication_channel}:{bot.cluster_id}"
         self.router = None
+        self.reply_router = None
         bot.loop.create_task(self.register_sub())
         self._messages = dict()
         """
         _messages should be a dict with the syntax {"<command_id>": [outputs]}
         """
+        self._waiters = dict()
+        """
+        _waiters should be a dict with the syntax {"<command_id>": (expected_count, future)}
+        """
+        self._reply_channels = dict()
+        """
+        _reply_channels should be a dict with the syntax {"<command_id>": "<channel>"}
+        for requests from other processes that are currently being answered
+        """
+        self.late_replies = 0
+        self.command_count = 0
+        self.heartbeat_task = bot.loop.create_task(self.heartbeat())
 
     def cog_unload(self):
+        self.heartbeat_task.cancel()
         self.bot.loop.create_task(self.unregister_sub())
+        self.bot.loop.create_task(
+            self.bot.redis.execute("HDEL", "clusterstats", self.bot.cluster_id)
+        )
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        self.command_count += 1
+
+    async def heartbeat(self):
+        """Periodically publishes this cluster's stats to a shared Redis hash"""
+        await self.bot.wait_until_ready()
+        process = psutil.Process()
+        last = time()
+        while not self.bot.is_closed():
+            now = time()
+            count, self.command_count = self.command_count, 0
+            last, elapsed = now, now - last
+            try:
+                stats = {
+                    "name": self.bot.cluster_name,
+                    "shard_ids": self.bot.shard_ids,
+                    "guilds": len(self.bot.guilds),
+                    "latency": round(self.bot.latency * 1000),
+                    "memory": process.memory_info().rss,
+                    "commands_per_minute": round(count * 60 / max(elapsed, 1), 2),
+                    "started_at": self.bot.launch_time.timestamp(),
+                    "commands": self.bot.profiler.top(),
+                    "timestamp": now,
+                }
+                await self.bot.redis.execute(
+                    "HSET", "clusterstats", self.bot.cluster_id, codec.encode(stats)
+                )
+            except Exception as e:
+                self.bot.logger.error(
+                    f"Failed to publish the cluster stats heartbeat: {e}"
+                )
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def get_cluster_stats(self):
+        """
+        Returns the last heartbeat of every cluster by cluster ID
+        Clusters which missed a few heartbeats are marked as not active,
+        expired heartbeats are removed
+        """
+        raw = await self.bot.redis.execute("HGETALL", "clusterstats")
+        now = time()
+        stats = {}
+        expired = []
+        it = iter(raw)
+        for cluster_id, data in zip(it, it):
+            data = codec.decode(data)
+            if now - data["timestamp"] > HEARTBEAT_EXPIRY:
+                expired.append(cluster_id)
+                continue
+            data["active"] = now - data["timestamp"] <= HEARTBEAT_INTERVAL * 3
+            stats[int(cluster_id)] = data
+        if expired:
+            await self.bot.redis.execute("HDEL", "clusterstats", *expired)
+        return stats
+
+    async def get_guild_count(self):
+        """Returns the amount of guilds across all active clusters"""
+        stats = await self.get_cluster_stats()
+        return sum(i["guilds"] for i in stats.values() if i["active"])
 
     async def register_sub(self):
-        if (
-            not bytes(self.communication_channel, "utf-8")
-            in self.bot.redis.pubsub_channels
-        ):
-            await self.bot.redis.execute_pubsub("SUBSCRIBE", self.communication_channel)
+        for channel in (self.communication_channel, self.reply_channel):
+            if not bytes(channel, "utf-8") in self.bot.redis.pubsub_channels:
+                await self.bot.redis.execute_pubsub("SUBSCRIBE", channel)
         self.router = self.bot.loop.create_task(self.event_handler())
+        self.reply_router = self.bot.loop.create_task(self.reply_handler())
 
     async def unregister_sub(self):
-        if self.router and not self.router.cancelled:
-            self.router.cancel()
-        await self.bot.redis.execute_pubsub("UNSUBSCRIBE", self.communication_channel)
+        for router in (self.router, self.reply_router):
+            if router and not router.cancelled():
+                router.cancel()
+        await self.bot.redis.execute_pubsub(
+            "UNSUBSCRIBE", self.communication_channel, self.reply_channel
+        )
+        for _count, future in self._waiters.values():
+            future.cancel()
 
     async def event_handler(self):
         """
         main router
 
         Possible messages to come:
-        {"scope":<bot/launcher>, "action": "<name>", "args": "<dict of args>", "command_id": "<uuid4>"}
+        {"scope":<bot/launcher>, "action": "<name>", "args": "<dict of args>", "command_id": "<uuid4>", "reply_to": "<channel>"}
         {"output": "<string>", "command_id": "<uuid4>"}
         """
         channel = self.bot.redis.pubsub_channels[
@@ -184,69 +271,91 @@ class Sharding(commands.Cog):
         ]
         while await channel.wait_message():
             try:
-                payload = await channel.get_json(encoding="utf-8")
-            except json.JSONDecodeError:
-                continue  # not a valid JSON message
+                payload = codec.decode(await channel.get())
+            except codec.CodecError:
+                continue  # not a valid message
             if payload.get("action") and hasattr(self, payload.get("action")):
                 if payload.get("scope") != "bot":
                     continue  # it's not our cup of tea
-                if payload.get("args"):
-                    self.bot.loop.create_task(
-                        getattr(self, payload["action"])(
-                            **payload["args"],
-                            command_id=payload["command_id"],
-                        )
-                    )
-                else:
-                    self.bot.loop.create_task(
-                        getattr(self, payload["action"])(
-                            command_id=payload["command_id"]
-                        )
-                    )
+                self.bot.loop.create_task(self.dispatch(payload))
             if payload.get("output") and payload["command_id"] in self._messages:
-                self._messages[payload["command_id"]].append(payload["output"])
+                # replies from processes that don't know about reply channels
+                self.collect(payload)
+
+    async def reply_handler(self):
+        """Router for the replies to requests sent by this process"""
+        channel = self.bot.redis.pubsub_channels[bytes(self.reply_channel, "utf-8")]
+        while await channel.wait_message():
+            try:
+                payload = codec.decode(await channel.get())
+            except codec.CodecError:
+                continue  # not a valid message
+            self.collect(payload)
+
+    def collect(self, payload):
+        """Hands a reply to the request waiting for it"""
+        command_id = payload.get("command_id")
+        if command_id not in self._messages:
+            self.late_replies += 1  # timed out already or not ours
+            return
+        outputs = self._messages[command_id]
+        outputs.append(payload.get("output"))
+        expected_count, future = self._waiters[command_id]
+        if len(outputs) >= expected_count and not future.done():
+            future.set_result(None)
+
+    async def dispatch(self, payload):
+        """Runs an action and remembers where to send its reply meanwhile"""
+        command_id = payload["command_id"]
+        if payload.get("reply_to"):
+            self._reply_channels[command_id] = payload["reply_to"]
+        try:
+            await getattr(self, payload["action"])(
+                **(payload.get("args") or {}), command_id=command_id
+            )
+        finally:
+            self._reply_channels.pop(command_id, None)
+
+    async def reply(self, output, command_id: str):
+        """Sends the output of an action back to the process that requested it"""
+        channel = self._reply_channels.get(command_id, self.communication_channel)
+        payload = {"output": output, "command_id": command_id}
+        await self.bot.redis.execute("PUBLISH", channel, codec.encode(payload))
 
     async def clear_donator_cache(self, user_id: int, command_id: int):
         self.bot.get_donator_rank.invalidate(self.bot, user_id)
 
+    async def invalidate_profile_cache(self, user_ids: list, command_id: str):
+        self.bot.cache.invalidate_local(*user_ids)
+
+    async def update_locale_cache(self, user_id: int, locale: str, command_id: str):
+        self.bot.locale_cache[user_id] = locale
+
+    async def update_prefix(self, guild_id: int, prefix: str, command_id: str):
+        if self.bot.get_guild(guild_id) is not None:
+            self.bot.set_prefix(guild_id, prefix)
+
     async def guild_count(self, command_id: str):
-        payload = {"output": len(self.bot.guilds), "command_id": command_id}
-        await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
-        )
+        await self.reply(len(self.bot.guilds), command_id)
 
     async def send_latency_and_shard_count(self, command_id: str):
-        payload = {
-            "output": {
-                f"{self.bot.cluster_id}": [
-                    self.bot.cluster_name,
-                    self.bot.shard_ids,
-                    round(self.bot.latency * 1000),
-                ]
-            },
-            "command_id": command_id,
+        output = {
+            f"{self.bot.cluster_id}": [
+                self.bot.cluster_name,
+                self.bot.shard_ids,
+                round(self.bot.latency * 1000),
+            ]
         }
-        await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
-        )
+        await self.reply(output, command_id)
 
     async def evaluate(self, code, command_id: str):
         if code.startswith("```") and code.endswith("```"):
             code = "\n".join(code.split("\n")[1:-1])
         code = code.strip("` \n")
-        payload = {"output": await _evaluate(self.bot, code), "command_id": command_id}
-        await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
-        )
+        await self.reply(await _evaluate(self.bot, code), command_id)
 
     async def latency(self, command_id: str):
-        payload = {
-            "output": round(self.bot.latency * 1000, 2),
-            "command_id": command_id,
-        }
-        await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
-        )
+        await self.reply(round(self.bot.latency * 1000, 2), command_id)
 
     async def wait_for_dms(self, event, check, timeout, command_id: str):
         """
@@ -279,10 +388,9 @@ class Sharding(commands.Cog):
             return e["op"] == 0 and e["t"] == event and data_matches(check, e["d"])
 
         out = await self.bot.wait_for("socket_response", check=pred, timeout=timeout)
-        payload = {"output": out["d"], "command_id": command_id}
-        await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
-        )
+        # only send back what Bot.wait_for_dms needs to rebuild the object
+        data = {k: v for k, v in out["d"].items() if k in DM_EVENT_FIELDS[event]}
+        await self.reply(data, command_id)
 
     async def handler(
         self,
@@ -307,22 +415,33 @@ class Sharding(commands.Cog):
         """
         # Preparation
         command_id = f"{uuid4()}"  # str conversion
-        self._messages[command_id] = []  # must create it (see the router)
-
-        # Sending
         payload = {"scope": scope, "action": action, "command_id": command_id}
         if args:
             payload["args"] = args
+        if expected_count <= 0:
+            # fire and forget, nobody has to answer us
+            await self.bot.redis.execute(
+                "PUBLISH", self.communication_channel, codec.encode(payload)
+            )
+            return []
+
+        payload["reply_to"] = self.reply_channel
+        future = self.bot.loop.create_future()
+        self._messages[command_id] = []  # must create it (see the router)
+        self._waiters[command_id] = (expected_count, future)
+
+        # Sending
         await self.bot.redis.execute(
-            "PUBLISH", self.communication_channel, json.dumps(payload)
+            "PUBLISH", self.communication_channel, codec.encode(payload)
         )
-        # Message collector
+        # Wait until the router has collected enough replies
         try:
             async with timeout(_timeout):
-                while len(self._messages[command_id]) < expected_count:
-                    await asyncio.sleep(0.1)
+                await future
         except asyncio.TimeoutError:
             pass
+        finally:
+            del self._waiters[command_id]
         return self._messages.pop(command_id, None)  # Cleanup
 
     @commands.command(
@@ -331,17 +450,14 @@ class Sharding(commands.Cog):
     @locale_doc
     async def timers(self, ctx):
         _("""Lists all your cooldowns, including your adventure timer.""")
-        cooldowns = await self.bot.redis.execute("KEYS", f"cd:{ctx.author.id}:*")
+        cooldowns = await self.bot.cooldowns.list("cd", ctx.author.id)
         adv = await self.bot.get_adventure(ctx.author)
         if not cooldowns and (not adv or adv[2]):
             return await ctx.send(
                 _("You don't have any active cooldown at the moment.")
             )
         timers = _("Commands on cooldown:")
-        for key in cooldowns:
-            key = key.decode()
-            cooldown = await self.bot.redis.execute("TTL", key)
-            cmd = key.replace(f"cd:{ctx.author.id}:", "")
+        for cmd, cooldown in cooldowns:
             text = _("{cmd} is on cooldown and will be available after {time}").format(
                 cmd=cmd, time=timedelta(seconds=int(cooldown))
             )
@@ -358,41 +474,43 @@ class Sharding(commands.Cog):
     async def clusters(self, ctx):
         _("""Lists all clusters and their current status.""")
         launcher_res = await self.handler("statuses", 1, scope="launcher")
-        if not launcher_res:
-            return await ctx.send(_("Launcher is dead, that is really bad."))
-        process_status = launcher_res[0]
-        # We have to calculate number of processes
-        processes, shards_left = divmod(
-            self.bot.shard_count, self.bot.config.shard_per_cluster
-        )
-        if shards_left:
-            processes += 1
-        process_res = await self.handler(
-            "send_latency_and_shard_count", processes, scope="bot"
-        )
-        actual_status = []
-        for cluster_id, cluster_data in process_status.items():
-            process_data = discord.utils.find(lambda x: cluster_id in x, process_res)
-            if process_data:
-                cluster_data["latency"] = f"{process_data[cluster_id][2]}ms"
+        stats = await self.get_cluster_stats()
+        if launcher_res:
+            process_status = {int(k): v for k, v in launcher_res[0].items()}
+            lines = []
+        else:
+            process_status = {}
+            lines = [_("Launcher is dead, that is really bad.")]
+        for cluster_id in sorted(process_status.keys() | stats.keys()):
+            # the launcher knows whether the process runs, the heartbeat whether
+            # it is responsive
+            process = process_status.get(cluster_id)
+            heartbeat = stats.get(cluster_id)
+            if process:
+                name, shards = process["name"], process["shard_list"]
+                state = (
+                    f"{'Active' if process['active'] else 'Inactive'}"
+                    f" {process['status']}"
+                )
+                started_at = process["started_at"]
             else:
-                cluster_data["latency"] = "NaN"
-            cluster_data["cluster_id"] = cluster_id
-            cluster_data["started_at"] = datetime.fromtimestamp(
-                cluster_data["started_at"]
+                name, shards = heartbeat["name"], heartbeat["shard_ids"]
+                state = "Unknown to the launcher" if launcher_res else "Unknown"
+                started_at = heartbeat["started_at"]
+            if heartbeat:
+                seen = (
+                    f"last seen {round(time() - heartbeat['timestamp'])}s ago"
+                    f"{'' if heartbeat['active'] else ' (missed heartbeats)'},"
+                    f" latency {heartbeat['latency']}ms"
+                )
+            else:
+                seen = "no heartbeat"
+            lines.append(
+                f"Cluster #{cluster_id} ({name}), shards {nice_join(shards)}:"
+                f" {state}, {seen}. Started at:"
+                f" {datetime.fromtimestamp(started_at)}"
             )
-            actual_status.append(cluster_data)
-        # actual_status.keys = active: bool, status: str, name: str, started_at: float, latency: str, cluster_id: int, shard_list: list[int]
-        status = "\n".join(
-            [
-                f"Cluster #{i['cluster_id']} ({i['name']}), shards"
-                f" {nice_join(i['shard_list'])}:"
-                f" {'Active' if i['active'] else 'Inactive'} {i['status']}, latency"
-                f" {i['latency']}. Started at: {i['started_at']}"
-                for i in actual_status
-            ]
-        )
-        await ctx.send(status)
+        await ctx.send("\n".join(lines))
 
 
 def setup(bot):
@@ -20,16 +20,17 @@ import datetime
 import math
 
 from collections import deque
-from decimal import Decimal
 
 import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import IntFromTo
 from cogs.help import chunks
 from cogs.shard_communication import user_on_cooldown as user_cooldown
 from utils import random
+from utils.battles import duel, raid_fight
 from utils.checks import has_char, user_has_char
 from utils.i18n import _, locale_doc
 
@@ -62,11 +63,7 @@ class Tournament(commands.Cog):
             await self.bot.reset_cooldown(ctx)
             return await ctx.send(_("You are too poor."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            prize,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", prize, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-prize)
 
         if ctx.channel.id == self.bot.config.official_tournament_channel_id:
@@ -78,11 +75,8 @@ class Tournament(commands.Cog):
             )
             await asyncio.sleep(60 * 10)
             a_participants = await self.bot.get_joins(id_)
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in a_participants:
-                    if await self.bot.cache.get_profile(u.id, conn=conn):
-                        participants.append(u)
+            profiles = await self.bot.cache.get_profiles([u.id for u in a_participants])
+            participants = [u for u in a_participants if u.id in profiles]
 
         else:
             msg = await ctx.send(
@@ -112,10 +106,8 @@ class Tournament(commands.Cog):
                 except asyncio.TimeoutError:
                     if len(participants) < 2:
                         await self.bot.reset_cooldown(ctx)
-                        await self.bot.pool.execute(
-                            'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                            prize,
-                            ctx.author.id,
+                        await queries.execute(
+                            self.bot.pool, "add_money", prize, ctx.author.id
                         )
                         await self.bot.cache.update_profile_cols_rel(
                             ctx.author.id, money=prize
@@ -160,21 +152,12 @@ class Tournament(commands.Cog):
                 await ctx.send(f"{match[0].mention} {text} {match[1].mention}")
                 await asyncio.sleep(2)
                 async with self.bot.pool.acquire() as conn:
-                    val1 = sum(
-                        await self.bot.get_damage_armor_for(match[0], conn=conn)
-                    ) + random.randint(1, 7)
-                    val2 = sum(
-                        await self.bot.get_damage_armor_for(match[1], conn=conn)
-                    ) + random.randint(1, 7)
-                if val1 > val2:
-                    winner = match[0]
-                    looser = match[1]
-                elif val2 > val1:
-                    winner = match[1]
-                    looser = match[0]
-                else:
-                    winner = random.choice(match)
-                    looser = match[1 - match.index(winner)]
+                    idx = duel(
+                        sum(await self.bot.get_damage_armor_for(match[0], conn=conn)),
+                        sum(await self.bot.get_damage_armor_for(match[1], conn=conn)),
+                    )
+                winner = match[idx]
+                looser = match[1 - idx]
                 participants.remove(looser)
                 await ctx.send(
                     _("Winner of this match is {winner}!").format(winner=winner.mention)
@@ -190,11 +173,7 @@ class Tournament(commands.Cog):
         )
 
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                prize,
-                participants[0].id,
-            )
+            await queries.execute(conn, "add_money", prize, participants[0].id)
             await self.bot.log_transaction(
                 ctx,
                 from_=ctx.author.id,
@@ -234,11 +213,7 @@ class Tournament(commands.Cog):
             await self.bot.reset_cooldown(ctx)
             return await ctx.send(_("You are too poor."))
 
-        await self.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            prize,
-            ctx.author.id,
-        )
+        await queries.execute(self.bot.pool, "remove_money", prize, ctx.author.id)
         await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=-prize)
 
         if ctx.channel.id == self.bot.config.official_tournament_channel_id:
@@ -250,11 +225,8 @@ class Tournament(commands.Cog):
             )
             await asyncio.sleep(60 * 10)
             a_participants = await self.bot.get_joins(id_)
-            participants = []
-            async with self.bot.pool.acquire() as conn:
-                for u in a_participants:
-                    if await self.bot.cache.get_profile(u.id, conn=conn):
-                        participants.append(u)
+            profiles = await self.bot.cache.get_profiles([u.id for u in a_participants])
+            participants = [u for u in a_participants if u.id in profiles]
 
         else:
             msg = await ctx.send(
@@ -283,10 +255,8 @@ class Tournament(commands.Cog):
                 except asyncio.TimeoutError:
                     if len(participants) < 2:
                         await self.bot.reset_cooldown(ctx)
-                        await self.bot.pool.execute(
-                            'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                            prize,
-                            ctx.author.id,
+                        await queries.execute(
+                            self.bot.pool, "add_money", prize, ctx.author.id
                         )
                         await self.bot.cache.update_profile_cols_rel(
                             ctx.author.id, money=prize
@@ -363,23 +333,8 @@ class Tournament(commands.Cog):
                 await asyncio.sleep(4)
 
                 start = datetime.datetime.utcnow()
-                attacker, defender = random.shuffle(players)
-                while (
-                    attacker["hp"] > 0
-                    and defender["hp"] > 0
-                    and datetime.datetime.utcnow()
-                    < start + datetime.timedelta(minutes=5)
-                ):
+                for attacker, defender, dmg in raid_fight(players):
                     # this is where the fun begins
-                    dmg = (
-                        attacker["damage"]
-                        + Decimal(random.randint(0, 100))
-                        - defender["armor"]
-                    )
-                    dmg = 1 if dmg <= 0 else dmg  # make sure no negative damage happens
-                    defender["hp"] -= dmg
-                    if defender["hp"] < 0:
-                        defender["hp"] = 0
                     battle_log.append(
                         (
                             battle_log[-1][0] + 1,
@@ -414,7 +369,10 @@ class Tournament(commands.Cog):
 
                     await log_message.edit(embed=embed)
                     await asyncio.sleep(4)
-                    attacker, defender = defender, attacker  # switch places
+                    if datetime.datetime.utcnow() >= start + datetime.timedelta(
+                        minutes=5
+                    ):
+                        break
                 if players[0]["hp"] == 0:
                     winner = match[1]
                     looser = match[0]
@@ -436,11 +394,7 @@ class Tournament(commands.Cog):
         )
 
         async with self.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                prize,
-                participants[0].id,
-            )
+            await queries.execute(conn, "add_money", prize, participants[0].id)
             await self.bot.log_transaction(
                 ctx,
                 from_=ctx.author.id,
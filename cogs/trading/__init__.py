@@ -23,6 +23,7 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from classes.converters import (
     DateNewerThan,
     IntFromTo,
@@ -98,11 +99,7 @@ class Trading(commands.Cog):
                     _("You cannot afford the tax of 5% (${amount}).").format(amount=tax)
                 )
             if tax:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                    tax,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "remove_money", tax, ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=ctx.author.id,
@@ -175,15 +172,9 @@ class Trading(commands.Cog):
             await conn.execute(
                 "UPDATE allitems SET owner=$1 WHERE id=$2;", ctx.author.id, item["id"]
             )
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                item["price"],
-                item["owner"],
-            )
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                item["price"] + tax,
-                ctx.author.id,
+            await queries.execute(conn, "add_money", item["price"], item["owner"])
+            await queries.execute(
+                conn, "remove_money", item["price"] + tax, ctx.author.id
             )
             await conn.execute(
                 "INSERT INTO inventory (item, equipped) VALUES ($1, $2);",
@@ -620,11 +611,7 @@ class Trading(commands.Cog):
                 value = int(value * (1 + buildings["trade_building"] / 2))
             async with conn.transaction():
                 await self.bot.delete_items([i["id"] for i in allitems], conn=conn)
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    value,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", value, ctx.author.id)
             await self.bot.log_transaction(
                 ctx,
                 from_=1,
@@ -709,11 +696,7 @@ class Trading(commands.Cog):
                 return await self.bot.reset_cooldown(ctx)
             async with conn.transaction():
                 await self.bot.delete_items([i["id"] for i in allitems], conn=conn)
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", money, ctx.author.id)
             await self.bot.cache.update_profile_cols_rel(ctx.author.id, money=money)
             await self.bot.log_transaction(
                 ctx,
@@ -808,11 +791,7 @@ class Trading(commands.Cog):
         async with self.bot.pool.acquire() as conn:
             if not await has_money(self.bot, ctx.author.id, item[1], conn=conn):
                 return await ctx.send(_("You are too poor to buy this item."))
-            await conn.execute(
-                'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-                item[1],
-                ctx.author.id,
-            )
+            await queries.execute(conn, "remove_money", item[1], ctx.author.id)
             await self.bot.log_transaction(
                 ctx,
                 from_=1,
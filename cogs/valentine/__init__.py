@@ -21,6 +21,7 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from cogs.shard_communication import next_day_cooldown
 from utils import random
 from utils.checks import has_char
@@ -104,11 +105,7 @@ class Valentine(commands.Cog):
         if prize == "money":
             money = random.randint(1, 10) * 1000
             async with self.bot.pool.acquire() as conn:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    money,
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", money, ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=1,
@@ -21,6 +21,7 @@ import discord
 
 from discord.ext import commands
 
+from classes import queries
 from cogs.shard_communication import next_day_cooldown
 from utils import random
 from utils.checks import has_char
@@ -123,11 +124,7 @@ class Christmas(commands.Cog):
                 )
                 reward_text = f"{reward_text}\n- {text}"
             if reward["money"]:
-                await conn.execute(
-                    'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                    reward["money"],
-                    ctx.author.id,
-                )
+                await queries.execute(conn, "add_money", reward["money"], ctx.author.id)
                 await self.bot.log_transaction(
                     ctx,
                     from_=1,
@@ -142,6 +142,21 @@ sentry_url = "https://whatever.sentry.url"
 """The redis PUBSUB channel used to communicate between processes"""
 shard_announce_channel = "guild_channel"
 
+"""How many decoded profiles each process keeps in memory in front of Redis"""
+profile_cache_size = 10000
+
+"""How many user locales each process keeps in memory"""
+locale_cache_size = 50000
+
+"""Queries slower than this (in milliseconds) end up in the slow query log"""
+slow_query_threshold = 100
+
+"""How many runs of each slow query get their plan captured"""
+slow_query_explain_count = 3
+
+"""Write transaction logs right away instead of batching them, e.g. for tests"""
+transaction_log_sync = False
+
 """The token used to interact with the raid backend."""
 raidauth = "my raid api auth code"
 
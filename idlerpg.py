@@ -15,18 +15,13 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import logging
-import sys
-
-import orjson
-
-# Ugly patch to use orjson globally
-sys.modules["json"] = orjson
-
 import asyncio
+import logging
 import os
+import sys
 
 import discord
+import orjson
 
 from contextvars_executor import ContextVarExecutor
 
@@ -88,6 +83,8 @@ if __name__ == "__main__":
     try:
         loop.run_until_complete(bot.connect_all())
     except KeyboardInterrupt:
+        if hasattr(bot, "transaction_log"):
+            loop.run_until_complete(bot.transaction_log.close())
 
         def shutdown_handler(loop_, context):
             if "exception" not in context or not isinstance(
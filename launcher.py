@@ -31,7 +31,7 @@ import aioredis
 import orjson
 
 from config import additional_shards, shard_announce_channel, shard_per_cluster, token
-from utils import random
+from utils import codec, random
 
 if sys.version_info < (3, 8):
     raise Exception("IdleRPG requires Python 3.8")
@@ -207,9 +207,9 @@ class Main:
         channel = self.redis.pubsub_channels[bytes(shard_announce_channel, "utf-8")]
         while await channel.wait_message():
             try:
-                payload = await channel.get_json(encoding="utf-8")
-            except orjson.JSONDecodeError:
-                continue  # not a valid JSON message
+                payload = codec.decode(await channel.get())
+            except codec.CodecError:
+                continue  # not a valid message
             if payload.get("scope") != "launcher" or not payload.get("action"):
                 continue  # not the launcher's task
             # parse the JSON args
@@ -246,8 +246,8 @@ class Main:
                     }
                 await self.redis.execute(
                     "PUBLISH",
-                    shard_announce_channel,
-                    orjson.dumps(
+                    payload.get("reply_to", shard_announce_channel),
+                    codec.encode(
                         {"command_id": payload["command_id"], "output": statuses}
                     ),
                 )
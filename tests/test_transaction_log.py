@@ -0,0 +1,97 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import asyncpg
+
+from classes.transaction_log import TransactionLogWriter
+
+MAX_INFO_LENGTH = 582
+
+
+def check_record(record):
+    if len(record[3]) > MAX_INFO_LENGTH:
+        raise asyncpg.StringDataRightTruncationError(
+            "value too long for type character varying(582)"
+        )
+
+
+class FakeConnection:
+    def __init__(self):
+        self.rows = []
+
+    async def copy_records_to_table(self, table, records, columns):
+        for record in records:
+            check_record(record)
+        self.rows.extend(records)
+
+    async def run_statement(self, name, method, *args):
+        check_record(args)
+        self.rows.append(args)
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.conn
+
+
+class FakeLogger:
+    def __init__(self):
+        self.errors = []
+
+    def error(self, message):
+        self.errors.append(message)
+
+    critical = error
+
+
+def record(info):
+    return (1, 2, "money", info, None)
+
+
+def test_oversized_record_does_not_hold_up_batch():
+    async def run():
+        bot = SimpleNamespace(
+            pool=FakePool(), logger=FakeLogger(), loop=asyncio.get_running_loop()
+        )
+        # flushed by hand, the background writer never gets to it
+        log = TransactionLogWriter(bot, interval=60)
+        records = [record("a"), record("x" * 600), record("b")]
+        for rec in records:
+            await log.add("transactions", rec)
+
+        assert await log.flush()
+        assert bot.pool.conn.rows == [records[0], records[2]]
+        assert log.pending == 0
+        assert log.buffers["transactions"] == []
+        assert len(bot.logger.errors) == 2
+
+        # the next batch is written normally
+        await log.add("transactions", record("c"))
+        assert await log.flush()
+        assert bot.pool.conn.rows[-1] == record("c")
+        await log.close()
+
+    asyncio.run(run())
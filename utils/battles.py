@@ -0,0 +1,66 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from utils import random
+
+
+def duel(stats1, stats2, rng=random):
+    """
+    Decides a regular battle between two players with the given stat sums
+    Returns 0 if the first player won, otherwise 1
+    """
+    val1 = stats1 + rng.randint(1, 7)
+    val2 = stats2 + rng.randint(1, 7)
+    if val1 == val2:
+        return rng.randint(0, 1)
+    return 0 if val1 > val2 else 1
+
+
+def active_roll(value, rng=random):
+    """Rolls how much of their damage or defense a player uses in an activebattle"""
+    return rng.choice(
+        [int(value), int(value * 0.5), int(value * 0.2), int(value * 0.8)]
+    )
+
+
+def raid_round(attacker, defender, rng=random):
+    """
+    Lets attacker hit defender once and returns the damage dealt
+    Both are dicts with hp, armor and damage like in raids
+    """
+    dmg = attacker["damage"] + rng.randint(0, 100) - defender["armor"]
+    dmg = 1 if dmg <= 0 else dmg  # make sure no negative damage happens
+    defender["hp"] = hp if (hp := defender["hp"] - dmg) > 0 else 0
+    return dmg
+
+
+def raid_fight(players, rng=random):
+    """
+    Yields attacker, defender and damage for each round of a raidbattle
+    A random player starts, then they take turns until one is dead
+    """
+    attacker, defender = rng.sample(players, 2)
+    while attacker["hp"] > 0 and defender["hp"] > 0:
+        yield attacker, defender, raid_round(attacker, defender, rng)
+        attacker, defender = defender, attacker
+
+
+def simulate_raid_fight(player1, player2, rng=random):
+    """Fights a whole raidbattle and returns 0 if player1 won, otherwise 1"""
+    for _round in raid_fight([player1, player2], rng):
+        pass
+    return 0 if player2["hp"] == 0 else 1
@@ -0,0 +1,60 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+
+def make_class_tables(classes):
+    """
+    Compiles the class config into lookup tables
+    Returns a dict mapping each class to its line and one mapping it to its grade
+    """
+    lines = {}
+    grades = {}
+    for line, evos in classes.items():
+        for grade, class_ in enumerate(evos, start=1):
+            # the first line a class appears in wins, like the old linear scan
+            lines.setdefault(class_, line)
+            grades.setdefault(class_, grade)
+    return lines, grades
+
+
+def stat_bonuses(classes, race, lines, grades):
+    """Returns the damage and armor a user gets from their classes and race"""
+    damage = armor = 0
+    for class_ in classes:
+        line, grade = lines.get(class_, "None"), grades.get(class_, 0)
+        if line == "Mage":
+            damage += grade
+        elif line == "Warrior":
+            armor += grade
+        elif line == "Paragon":
+            damage += grade
+            armor += grade
+    if race == "Human":
+        damage += 2
+        armor += 2
+    elif race == "Dwarf":
+        damage += 1
+        armor += 3
+    elif race == "Elf":
+        damage += 3
+        armor += 1
+    elif race == "Orc":
+        armor += 4
+    elif race == "Jikill":
+        damage += 4
+    return damage, armor
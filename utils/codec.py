@@ -0,0 +1,52 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from typing import Any, Dict
+
+import orjson
+
+# Bumped whenever the message layout changes incompatibly
+VERSION = 1
+_HEADER = bytes((VERSION,))
+
+
+class CodecError(Exception):
+    """Exception raised when a bus message cannot be decoded."""
+
+    pass
+
+
+def encode(payload: Dict[str, Any]) -> bytes:
+    """Encodes a message for the inter-process pub/sub bus"""
+    return _HEADER + orjson.dumps(payload)
+
+
+def decode(data: bytes) -> Dict[str, Any]:
+    """Decodes a message from the inter-process pub/sub bus"""
+    if not data:
+        raise CodecError("Empty message")
+    try:
+        if data[0] == VERSION:
+            payload: Dict[str, Any] = orjson.loads(data[1:])
+            return payload
+        if data[:1] == b"{":
+            # unversioned JSON sent by older processes
+            legacy: Dict[str, Any] = orjson.loads(data)
+            return legacy
+    except orjson.JSONDecodeError as e:
+        raise CodecError("Malformed message") from e
+    raise CodecError(f"Unknown message version {data[0]}")
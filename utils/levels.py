@@ -0,0 +1,72 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from bisect import bisect_right
+from itertools import repeat
+
+# XP needed to reach each level, starting with level 1
+LEVEL_XP = (
+    0,
+    1500,
+    9000,
+    22500,
+    42000,
+    67500,
+    99000,
+    136500,
+    180000,
+    229500,
+    285000,
+    346500,
+    414000,
+    487500,
+    567000,
+    697410,
+    857814,
+    1055112,
+    1297787,
+    1596278,
+    1931497,
+    2298481,
+    2689223,
+    3092606,
+    3494645,
+    3879056,
+    4228171,
+    4608707,
+    5023490,
+    5475604,
+)
+MAX_LEVEL = len(LEVEL_XP)
+
+
+def xptolevel(xp):
+    """Returns the level for an amount of XP"""
+    return bisect_right(LEVEL_XP, xp)
+
+
+def xptolevels(xps):
+    """Returns the levels for many amounts of XP at once, e.g. a leaderboard"""
+    return list(map(bisect_right, repeat(LEVEL_XP), xps))
+
+
+def xptonextlevel(xp):
+    level = xptolevel(xp)
+    if level == MAX_LEVEL:
+        return "Infinity"
+    else:
+        return f"{LEVEL_XP[level] - xp}"
@@ -16,25 +16,50 @@ from utils import random
 
 N, S, W, E = ("n", "s", "w", "e")
 
+# Every cell is one byte in Maze.grid, the low 4 bits are the standing walls
+NORTH, SOUTH, WEST, EAST = 1, 2, 4, 8
+ALL_WALLS = NORTH | SOUTH | WEST | EAST
+TRAP, ENEMY, TREASURE = 16, 32, 64
+
+WALL_BITS = {N: NORTH, S: SOUTH, W: WEST, E: EAST}
+# The set of wall letters for each combination of wall bits
+WALLS_BY_MASK = tuple(
+    frozenset(d for d, bit in WALL_BITS.items() if mask & bit)
+    for mask in range(ALL_WALLS + 1)
+)
+# Unicode character for a wall with other walls in the directions of the bits
+BOX_BY_MASK = (
+    "·",  # a post without walls, impossible in a perfect maze
+    "╵",
+    "╷",
+    "│",
+    "╴",
+    "┘",
+    "┐",
+    "┤",
+    "╶",
+    "└",
+    "┌",
+    "├",
+    "─",
+    "┴",
+    "┬",
+    "┼",
+)
+
 
 class Cell(object):
     """
-    Class for each individual cell. Knows only its position and which walls are
-    still standing.
+    View of a single cell in a maze. Reads and writes go to the maze's grid.
     """
 
-    def __init__(self, x, y, walls):
+    __slots__ = ("grid", "index", "x", "y")
+
+    def __init__(self, maze, x, y):
+        self.grid = maze.grid
+        self.index = x + y * maze.width
         self.x = x
         self.y = y
-        self.walls = set(walls)
-        self.trap = random.choice([False] * 9 + [True])  # 10% Chance of being a trap
-        if not self.trap:
-            self.enemy = random.choice(
-                [False] * 9 + [True]
-            )  # If no trap, 10% Chance of an enemy here
-        else:
-            self.enemy = False
-        self.treasure = False
 
     def __repr__(self):
         # <15, 25 (es  )>
@@ -42,75 +67,61 @@ class Cell(object):
 
     def __contains__(self, item):
         # N in cell
-        return item in self.walls
+        return self.grid[self.index] & WALL_BITS[item] != 0
+
+    @property
+    def walls(self):
+        return WALLS_BY_MASK[self.grid[self.index] & ALL_WALLS]
 
     def is_full(self):
         """
         Returns True if all walls are still standing.
         """
-        return len(self.walls) == 4
+        return self.grid[self.index] & ALL_WALLS == ALL_WALLS
 
-    def _wall_to(self, other):
-        """
-        Returns the direction to the given cell from the current one.
-        Must be one cell away only.
-        """
-        assert abs(self.x - other.x) + abs(self.y - other.y) == 1, "{}, {}".format(
-            self, other
-        )
-        if other.y < self.y:
-            return N
-        elif other.y > self.y:
-            return S
-        elif other.x < self.x:
-            return W
-        elif other.x > self.x:
-            return E
+    def _get_flag(self, flag):
+        return self.grid[self.index] & flag != 0
+
+    def _set_flag(self, flag, value):
+        if value:
+            self.grid[self.index] |= flag
         else:
-            assert False
+            self.grid[self.index] &= ~flag
 
-    def connect(self, other):
-        """
-        Removes the wall between two adjacent cells.
-        """
-        other.walls.remove(other._wall_to(self))
-        self.walls.remove(self._wall_to(other))
+    trap = property(
+        lambda self: self._get_flag(TRAP), lambda self, v: self._set_flag(TRAP, v)
+    )
+    enemy = property(
+        lambda self: self._get_flag(ENEMY), lambda self, v: self._set_flag(ENEMY, v)
+    )
+    treasure = property(
+        lambda self: self._get_flag(TREASURE),
+        lambda self, v: self._set_flag(TREASURE, v),
+    )
 
 
 class Maze(object):
     """
     Maze class containing full board and maze generation algorithms.
+    The board is a bytearray with one byte of wall and content bits per cell.
     """
 
-    # Unicode character for a wall with other walls in the given directions.
-    UNICODE_BY_CONNECTIONS = {
-        "ensw": "┼",
-        "ens": "├",
-        "enw": "┴",
-        "esw": "┬",
-        "es": "┌",
-        "en": "└",
-        "ew": "─",
-        "e": "╶",
-        "nsw": "┤",
-        "ns": "│",
-        "nw": "┘",
-        "sw": "┐",
-        "s": "╷",
-        "n": "╵",
-        "w": "╴",
-    }
-
     def __init__(self, width=20, height=10):
         """
         Creates a new maze with the given sizes, with all walls standing.
         """
         self.width = width
         self.height = height
-        self.cells = []
-        for y in range(self.height):
-            for x in range(self.width):
-                self.cells.append(Cell(x, y, [N, S, E, W]))
+        self.grid = bytearray(width * height)
+        for index in range(len(self.grid)):
+            roll = random.randint(0, 99)
+            if roll < 10:  # 10% Chance of being a trap
+                self.grid[index] = ALL_WALLS | TRAP
+            elif roll < 19:  # If no trap, 10% Chance of an enemy here
+                self.grid[index] = ALL_WALLS | ENEMY
+            else:
+                self.grid[index] = ALL_WALLS
+        self._rows = None
 
     def __getitem__(self, index):
         """
@@ -118,7 +129,7 @@ class Maze(object):
         """
         x, y = index
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.cells[x + y * self.width]
+            return Cell(self, x, y)
         else:
             return None
 
@@ -134,39 +145,67 @@ class Maze(object):
             if neighbor is not None:
                 yield neighbor
 
-    def _to_str_matrix(self):
+    def _render_rows(self):
+        """
+        Returns the lines of the Unicode representation. Every cell is 4 chars
+        wide and 2 lines high: its top left post and top wall, then its west
+        wall and floor. The posts are the only chars that depend on their
+        surroundings.
         """
-        Returns a matrix with a pretty printed visual representation of this
-        maze. Example 5x5:
-
-        OOOOOOOOOOO
-        O       O O
-        OOO OOO O O
-        O O   O   O
-        O OOO OOO O
-        O   O O   O
-        OOO O O OOO
-        O   O O O O
-        O OOO O O O
-        O     O   O
-        OOOOOOOOOOO
+        grid, width, height = self.grid, self.width, self.height
+        rows = []
+        for y in range(height + 1):
+            base = y * width
+            top = []
+            for x in range(width + 1):
+                # walls on the borders are always standing
+                mask = 0
+                if y > 0 and (x == width or grid[base - width + x] & WEST):
+                    mask |= NORTH
+                if y < height and (x == width or grid[base + x] & WEST):
+                    mask |= SOUTH
+                if x > 0 and (y == height or grid[base + x - 1] & NORTH):
+                    mask |= WEST
+                if x < width:
+                    if y == height or grid[base + x] & NORTH:
+                        mask |= EAST
+                        top.append(BOX_BY_MASK[mask])
+                        top.append("───")
+                    else:
+                        top.append(BOX_BY_MASK[mask])
+                        top.append("   ")
+                else:
+                    top.append(BOX_BY_MASK[mask])
+            rows.append("".join(top))
+            if y < height:
+                middle = [
+                    "│   " if grid[base + x] & WEST else "    " for x in range(width)
+                ]
+                middle.append("│")
+                rows.append("".join(middle))
+        return rows
+
+    def render(self, x=None, y=None, radius=None, marker="X"):
         """
-        str_matrix = [["O"] * (self.width * 2 + 1) for i in range(self.height * 2 + 1)]
-
-        for cell in self.cells:
-            x = cell.x * 2 + 1
-            y = cell.y * 2 + 1
-            str_matrix[y][x] = " "
-            if N not in cell and y > 0:
-                str_matrix[y - 1][x + 0] = " "
-            if S not in cell and y + 1 < self.width:
-                str_matrix[y + 1][x + 0] = " "
-            if W not in cell and x > 0:
-                str_matrix[y][x - 1] = " "
-            if E not in cell and x + 1 < self.width:
-                str_matrix[y][x + 1] = " "
-
-        return str_matrix
+        Returns an Unicode representation of the maze, with marker in the cell
+        at (x, y) if given. If radius is given, only the cells at most radius
+        cells away from (x, y) in each direction are included.
+
+        The walls are rendered once and cached, so this only rebuilds the line
+        with the marker and cuts out the requested part.
+        """
+        if self._rows is None:
+            self._rows = self._render_rows()
+        rows = self._rows
+        if x is not None:
+            rows = rows.copy()
+            line = rows[y * 2 + 1]
+            rows[y * 2 + 1] = f"{line[:x * 4 + 2]}{marker}{line[x * 4 + 3:]}"
+        if radius is not None:
+            left, right = max(x - radius, 0) * 4, min(x + radius + 1, self.width) * 4
+            top, bottom = max(y - radius, 0) * 2, min(y + radius + 1, self.height) * 2
+            rows = [line[left : right + 1] for line in rows[top : bottom + 1]]
+        return "\n".join(rows) + "\n"
 
     def __repr__(self):
         """
@@ -185,69 +224,7 @@ class Maze(object):
         │   │               │
         └───┴───────────────┘
         """
-        # Starts with regular representation. Looks stretched because chars are
-        # twice as high as they are wide (look at docs example in
-        # `Maze._to_str_matrix`).
-        skinny_matrix = self._to_str_matrix()
-
-        # Simply duplicate each character in each line.
-        double_wide_matrix = []
-        for line in skinny_matrix:
-            double_wide_matrix.append([])
-            for char in line:
-                double_wide_matrix[-1].append(char)
-                double_wide_matrix[-1].append(char)
-
-        # The last two chars of each line are walls, and we will need only one.
-        # So we remove the last char of each line.
-        matrix = [line[:-1] for line in double_wide_matrix]
-
-        def g(x, y):
-            """
-            Returns True if there is a wall at (x, y). Values outside the valid
-            range always return false.
-
-            This is a temporary helper function.
-            """
-            if 0 <= x < len(matrix[0]) and 0 <= y < len(matrix):
-                return matrix[y][x] != " "
-            else:
-                return False
-
-        # Fix double wide walls, finally giving the impression of a symmetric
-        # maze.
-        for y, line in enumerate(matrix):
-            for x, char in enumerate(line):
-                if not g(x, y) and g(x - 1, y):
-                    matrix[y][x - 1] = " "
-
-        # Right now the maze has the correct aspect ratio, but is still using
-        # 'O' to represent walls.
-
-        # Finally we replace the walls with Unicode characters depending on
-        # their context.
-        for y, line in enumerate(matrix):
-            for x, char in enumerate(line):
-                if not g(x, y):
-                    continue
-
-                connections = set((N, S, E, W))
-                if not g(x, y + 1):
-                    connections.remove(S)
-                if not g(x, y - 1):
-                    connections.remove(N)
-                if not g(x + 1, y):
-                    connections.remove(E)
-                if not g(x - 1, y):
-                    connections.remove(W)
-
-                str_connections = "".join(sorted(connections))
-                # Note we are changing the matrix we are reading. We need to be
-                # careful as to not break the `g` function implementation.
-                matrix[y][x] = Maze.UNICODE_BY_CONNECTIONS[str_connections]
-
-        # Simple double join to transform list of lists into string.
-        return "\n".join("".join(line) for line in matrix) + "\n"
+        return self.render()
 
     def randomize(self):
         """
@@ -255,20 +232,34 @@ class Maze(object):
 
         Algorithm from http://mazeworks.com/mazegen/mazetut/index.htm
         """
-        cell_stack = []
-        cell = random.choice(self.cells)
+        grid, width = self.grid, self.width
+        size = len(grid)
+        index = random.randint(0, size - 1)
+        index_stack = []
         n_visited_cells = 1
 
-        while n_visited_cells < len(self.cells):
-            neighbors = [c for c in self.neighbors(cell) if c.is_full()]
-            if len(neighbors):
-                neighbor = random.choice(neighbors)
-                cell.connect(neighbor)
-                cell_stack.append(cell)
-                cell = neighbor
+        while n_visited_cells < size:
+            x = index % width
+            neighbors = []
+            if index >= width and grid[index - width] & ALL_WALLS == ALL_WALLS:
+                neighbors.append((index - width, NORTH, SOUTH))
+            if index + width < size and grid[index + width] & ALL_WALLS == ALL_WALLS:
+                neighbors.append((index + width, SOUTH, NORTH))
+            if x > 0 and grid[index - 1] & ALL_WALLS == ALL_WALLS:
+                neighbors.append((index - 1, WEST, EAST))
+            if x + 1 < width and grid[index + 1] & ALL_WALLS == ALL_WALLS:
+                neighbors.append((index + 1, EAST, WEST))
+            if neighbors:
+                neighbor, wall, opposite = random.choice(neighbors)
+                grid[index] &= ~wall
+                grid[neighbor] &= ~opposite
+                index_stack.append(index)
+                index = neighbor
                 n_visited_cells += 1
             else:
-                cell = cell_stack.pop()
+                index = index_stack.pop()
+
+        self._rows = None
 
     @staticmethod
     def generate(width=20, height=10, treasures=5):
@@ -278,9 +269,8 @@ class Maze(object):
         m = Maze(width, height)
         m.randomize()
 
-        cells = random.sample(m.cells[1:], treasures)
-        for cell in cells:
-            cell.treasure = True
+        for index in random.sample(range(1, width * height), treasures):
+            m.grid[index] |= TREASURE
 
         return m
 
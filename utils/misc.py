@@ -15,9 +15,11 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
+import asyncio
 import base64
 import hashlib
 import hmac
+import secrets
 import time
 
 from decimal import Decimal
@@ -26,38 +28,10 @@ from discord.errors import NotFound
 
 from utils import random
 
-levels = {
-    1: 0,
-    2: 1500,
-    3: 9000,
-    4: 22500,
-    5: 42000,
-    6: 67500,
-    7: 99000,
-    8: 136500,
-    9: 180000,
-    10: 229500,
-    11: 285000,
-    12: 346500,
-    13: 414000,
-    14: 487500,
-    15: 567000,
-    16: 697410,
-    17: 857814,
-    18: 1055112,
-    19: 1297787,
-    20: 1596278,
-    21: 1931497,
-    22: 2298481,
-    23: 2689223,
-    24: 3092606,
-    25: 3494645,
-    26: 3879056,
-    27: 4228171,
-    28: 4608707,
-    29: 5023490,
-    30: 5475604,
-}
+# how long resolved user names are shared between clusters
+NAME_CACHE_TTL = 86400
+# how many users are fetched from Discord at the same time
+NAME_FETCH_CONCURRENCY = 5
 
 
 def random_token(id_):
@@ -66,7 +40,7 @@ def random_token(id_):
     time_ = base64.b64encode(
         int.to_bytes(int(time.time()), 6, byteorder="big")
     ).decode()
-    randbytes = bytearray(random.randbits(8) for _ in range(10))
+    randbytes = secrets.token_bytes(10)
     hmac_ = hmac.new(randbytes, randbytes, hashlib.md5).hexdigest()
     return f"{id_}.{time_}.{hmac_}"
 
@@ -77,24 +51,6 @@ def nice_join(iterable):
     return f"{', '.join([str(i) for i in iterable[:-1]])} and {iterable[-1]}"
 
 
-def xptolevel(xp):
-    for level, point in levels.items():
-        if xp == point:
-            return level
-        elif xp < point:
-            return level - 1
-    return 30
-
-
-def xptonextlevel(xp):
-    level = xptolevel(xp)
-    if level == 30:
-        return "Infinity"
-    else:
-        nextxp = levels[level + 1]
-        return f"{nextxp - xp}"
-
-
 def calcchance(
     sword, shield, dungeon, level, luck, returnsuccess=False, booster=False, bonus=0
 ):
@@ -127,17 +83,55 @@ def calcchance(
 
 
 async def lookup(bot, userid, return_none=False):
-    userid = int(userid)
-    member = await bot.get_user_global(userid)
-    if member:
-        return str(member)
-    else:
-        try:
-            member = await bot.fetch_user(userid)
-        except NotFound:
-            if return_none:
-                return None
-            else:
-                return "None"
-        else:
-            return str(member)
+    return (await lookup_many(bot, [userid], return_none=return_none))[0]
+
+
+async def lookup_many(bot, userids, return_none=False):
+    """
+    Resolves many user IDs to names at once, in the order given.
+    The local cache and the shared Redis name cache are checked first,
+    everything else is fetched concurrently and stored in Redis.
+    """
+    userids = [int(i) for i in userids]
+    names = {}
+    for userid in userids:
+        if (member := bot.get_user(userid)) is not None:
+            names[userid] = str(member)
+
+    missing = [i for i in dict.fromkeys(userids) if i not in names]
+    if missing:
+        cached = await bot.redis.execute("MGET", *[f"username:{i}" for i in missing])
+        for userid, name in zip(missing, cached):
+            if name is not None:
+                names[userid] = name.decode()
+        missing = [i for i in missing if i not in names]
+
+    if missing:
+        semaphore = asyncio.Semaphore(NAME_FETCH_CONCURRENCY)
+
+        async def fetch(userid):
+            async with semaphore:
+                try:
+                    return str(await bot.fetch_user(userid))
+                except NotFound:
+                    return None
+
+        fetched = await asyncio.gather(*[fetch(i) for i in missing])
+        to_cache = []
+        for userid, name in zip(missing, fetched):
+            if name is not None:
+                names[userid] = name
+                to_cache.append((userid, name))
+        if to_cache:
+            async with bot.redis.get() as redis:
+                await asyncio.gather(
+                    *[
+                        redis.execute(
+                            "SET", f"username:{i}", name, "EX", NAME_CACHE_TTL
+                        )
+                        for i, name in to_cache
+                    ]
+                )
+
+    default = None if return_none else "None"
+    return [names.get(i, default) for i in userids]
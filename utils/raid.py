@@ -0,0 +1,140 @@
+"""
+The IdleRPG Discord Bot
+Copyright (C) 2018-2020 Diniboy and Gelbpunkt
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+
+from random import Random
+
+from utils import random
+
+
+def getfinaldmg(damage, defense):
+    return v if (v := damage - defense) > 0 else 0
+
+
+class RaidTurn:
+    """What happened in a single turn of a boss raid."""
+
+    __slots__ = ("target", "damage", "armor", "target_hp", "raid_damage", "boss_hp")
+
+    def __init__(self, target, damage, armor, target_hp, raid_damage, boss_hp):
+        self.target = target
+        self.damage = damage  # effective damage the target took
+        self.armor = armor
+        self.target_hp = target_hp
+        self.raid_damage = raid_damage
+        self.boss_hp = boss_hp
+
+    @property
+    def died(self):
+        return self.target_hp <= 0
+
+
+class BossRaid:
+    """
+    A boss raid without any Discord I/O.
+
+    Every turn the boss attacks a random raider, then all raiders hit the boss.
+    raiders maps whatever identifies a raider to a dict with hp, armor and
+    damage, boss is a dict with hp, min_dmg and max_dmg. Both are updated in
+    place, so changes to the boss during a raid are picked up and the dead
+    raiders are gone from raiders afterwards.
+    If dead_attack is True, a raider killed in a turn still hits the boss.
+    """
+
+    def __init__(self, raiders, boss, seed=None, rng=None, dead_attack=False):
+        self.raiders = raiders
+        self.boss = boss
+        if rng is None:
+            rng = random if seed is None else Random(seed)
+        self.rng = rng
+        self.dead_attack = dead_attack
+        self.turns = 0
+        # raiders only lose damage by dying, so the sum is kept up to date
+        self.raid_damage = sum(i["damage"] for i in raiders.values())
+
+    @property
+    def finished(self):
+        return self.boss["hp"] <= 0 or not self.raiders
+
+    def step(self):
+        """Simulates the next turn and returns what happened"""
+        target = self.rng.choice(list(self.raiders.keys()))
+        stats = self.raiders[target]
+        dmg = self.rng.randint(self.boss["min_dmg"], self.boss["max_dmg"])
+        dmg = getfinaldmg(dmg, stats["armor"])
+        stats["hp"] -= dmg
+        raid_damage = self.raid_damage
+        if stats["hp"] <= 0:
+            del self.raiders[target]
+            self.raid_damage -= stats["damage"]
+            if not self.dead_attack:
+                raid_damage = self.raid_damage
+        self.boss["hp"] -= raid_damage
+        self.turns += 1
+        return RaidTurn(
+            target, dmg, stats["armor"], stats["hp"], raid_damage, self.boss["hp"]
+        )
+
+    def run(self, max_turns=None):
+        """Simulates the whole raid and returns all turns"""
+        turns = []
+        while not self.finished and (max_turns is None or len(turns) < max_turns):
+            turns.append(self.step())
+        return turns
+
+
+class RaidPresenter:
+    """
+    Streams a raid to a channel at a fixed pace.
+
+    render turns a RaidTurn into a list of message kwargs, which are sent
+    interval seconds apart. A turn is due every turn_interval seconds. If
+    sending falls behind, e.g. because the channel is rate limited, up to
+    max_batch due turns are simulated at once and sent as the single
+    message that summarize returns for them.
+    """
+
+    def __init__(
+        self, ctx, render, summarize, interval=4, turn_interval=8, max_batch=5
+    ):
+        self.ctx = ctx
+        self.render = render
+        self.summarize = summarize
+        self.interval = interval
+        self.turn_interval = turn_interval
+        self.max_batch = max_batch
+
+    async def play(self, raid, time_limit=None):
+        """Runs the raid until it is finished or time_limit seconds passed"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        while not raid.finished:
+            elapsed = loop.time() - start
+            if time_limit is not None and elapsed >= time_limit:
+                break
+            due = int(elapsed // self.turn_interval) + 1 - raid.turns
+            batch = []
+            while not raid.finished and len(batch) < min(max(due, 1), self.max_batch):
+                batch.append(raid.step())
+            if len(batch) == 1:
+                messages = self.render(batch[0])
+            else:
+                messages = [self.summarize(batch)]
+            for message in messages:
+                await self.ctx.send(**message)
+                await asyncio.sleep(self.interval)
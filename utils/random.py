@@ -15,43 +15,56 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
-import secrets
-
 from collections.abc import Sequence, Set
-from copy import copy
+from random import Random
 
-choice = secrets.choice
-randbits = secrets.randbits
+# Gameplay randomness uses a fast PRNG seeded from the OS by default.
+# Anything security relevant must use the secrets module directly.
+backend = Random()
 
 
-def sample(population, k):
-    """Chooses k unique random elements from a population sequence or set."""
+def set_backend(rng):
+    """
+    Replaces the generator used by this module
+    Pass a seeded random.Random to reproduce results or secrets.SystemRandom
+    for OS randomness
+    """
+    global backend
+    backend = rng
+
+
+def choice(seq):
+    """Chooses a random element from a non-empty sequence."""
+    return backend.choice(seq)
+
+
+def _as_sequence(population):
     if isinstance(population, Set):
-        population = tuple(population)
+        return tuple(population)
     if not isinstance(population, Sequence):
         raise TypeError(
             "Population must be a sequence or set.  For dicts, use list(d)."
         )
+    return population
 
-    n = len(population)
-    population = copy(population)
 
-    if not 0 <= k <= n:
+def sample(population, k):
+    """Chooses k unique random elements from a population sequence or set."""
+    population = _as_sequence(population)
+    if not 0 <= k <= len(population):
         raise ValueError("Sample larger than population or is negative")
-
-    results = []
-    for i in range(k):
-        results.append(population.pop(secrets.randbelow(n - i)))
-
-    return results
+    # Fisher-Yates based, linear in k
+    return backend.sample(population, k)
 
 
 def shuffle(population):
     """Returns a shuffled list"""
-    return sample(population, len(population))
+    population = list(_as_sequence(population))
+    # Fisher-Yates in place, linear in the population size
+    backend.shuffle(population)
+    return population
 
 
 def randint(a, b):
     """Return random integer in range [a, b], including both end points."""
-    a, b = int(a), int(b)
-    return secrets.randbelow(b - a + 1) + a
+    return backend.randint(int(a), int(b))
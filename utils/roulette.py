@@ -17,6 +17,7 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import asyncio
 
+from classes import queries
 from utils import random
 from utils.i18n import _
 
@@ -167,10 +168,8 @@ class RouletteGame:
             await self.handle_loss()
 
     async def remove_money(self):
-        await self.ctx.bot.pool.execute(
-            'UPDATE profile SET "money"="money"-$1 WHERE "user"=$2;',
-            self.money,
-            self.ctx.author.id,
+        await queries.execute(
+            self.ctx.bot.pool, "remove_money", self.money, self.ctx.author.id
         )
         await self.ctx.bot.cache.update_profile_cols_rel(
             self.ctx.author.id, money=-self.money
@@ -178,10 +177,8 @@ class RouletteGame:
 
     async def handle_win(self):
         async with self.ctx.bot.pool.acquire() as conn:
-            await conn.execute(
-                'UPDATE profile SET "money"="money"+$1 WHERE "user"=$2;',
-                self.money * (self.payout + 1),
-                self.ctx.author.id,
+            await queries.execute(
+                conn, "add_money", self.money * (self.payout + 1), self.ctx.author.id
             )
             await self.ctx.bot.log_transaction(
                 self.ctx,